@@ -3,9 +3,19 @@
 __version__ = '0.0.1'
 
 from . import incentives
-from .incentives import *
+from .incentives.tax_incentives import *
+from .incentives.state_data import *
+
+def __getattr__(name):
+    # Names that depend on BioSTEAM are imported from incentives on first use
+    if name in incentives._lazy_names:
+        return getattr(incentives, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+def __dir__():
+    return sorted([*globals(), *incentives._lazy_names])
 
 __all__ = (
     'incentives',
     *incentives.__all__,
-)
\ No newline at end of file
+)
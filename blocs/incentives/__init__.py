@@ -7,10 +7,52 @@ Created on Thu Sep 24 10:30:08 2020
 """
 from .tax_incentives import *
 from . import tax_incentives
-from .incentives_tea import *
-from . import incentives_tea
+from .state_data import *
+from . import state_data
+from importlib import import_module
+
+# Modules that depend on BioSTEAM (or pandas) are only imported on first
+# use, so the tax incentive calculators can be imported quickly
+_lazy_modules = {
+    'incentives_tea': (
+        'create_corn_tea',
+        'create_sugarcane_tea',
+        'create_cornstover_tea',
+        'create_incentivized_tea',
+        'ConventionalIncentivesTEA',
+        'CellulosicIncentivesTEA',
+        'ScenarioOverlay',
+        'CashFlowWorkspace',
+    ),
+    'model': (
+        'ECONOMIC_KINDS',
+        'IncentivesModel',
+    ),
+    'checkpoints': (
+        'CheckpointStore',
+        'evaluate_with_checkpoints',
+    ),
+    'correlation': (
+        'SpearmanAccumulator',
+    ),
+    'evaluation': (),
+}
+_lazy_names = {j: i for i, names in _lazy_modules.items() for j in names}
+
+def __getattr__(name):
+    if name in _lazy_modules:
+        return import_module(f'{__name__}.{name}')
+    elif name in _lazy_names:
+        value = getattr(import_module(f'{__name__}.{_lazy_names[name]}'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+def __dir__():
+    return sorted([*globals(), *_lazy_modules, *_lazy_names])
 
 __all__ = (
     *tax_incentives.__all__,
-    *incentives_tea.__all__,
+    *state_data.__all__,
+    *_lazy_names,
 )
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Append-only columnar store for checkpointing long model evaluations.
+
+Chunks are saved in the Arrow IPC format if pyarrow is installed and as
+NumPy .npz files otherwise. Saving a checkpoint only writes the newly
+evaluated samples, so its cost does not grow with the number of samples.
+
+"""
+import os
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa
+    from pyarrow import ipc
+except ImportError:
+    pa = ipc = None
+
+__all__ = (
+    'CheckpointStore',
+    'evaluate_with_checkpoints',
+)
+
+def get_column_name(index):
+    return index if isinstance(index, str) else ' - '.join(index)
+
+def get_progress_note(count, timer, correlation=None):
+    note = f"[{count}] Elapsed time: {timer.elapsed_time:.0f} sec"
+    if correlation is not None:
+        # Strongest rank correlation estimated so far
+        rho = correlation.rho()
+        if np.isfinite(rho).any():
+            p, m = np.unravel_index(np.nanargmax(np.abs(rho)), rho.shape)
+            note += f"; strongest correlation: {rho[p, m]:.2f} ({correlation.parameters[p].name} - {correlation.metrics[m].name})"
+    return note
+
+
+class CheckpointStore:
+    """
+    Create a CheckpointStore object that saves evaluation results as
+    append-only columnar chunks in a folder.
+
+    Parameters
+    ----------
+    folder : str
+        Folder to save chunks.
+
+    """
+    __slots__ = ('folder',)
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    @property
+    def extension(self):
+        """[str] Extension of new chunk files."""
+        return '.npz' if pa is None else '.arrow'
+
+    def chunk_files(self):
+        """Return paths of all chunk files in order."""
+        folder = self.folder
+        if not os.path.isdir(folder): return []
+        return [
+            os.path.join(folder, i) for i in sorted(os.listdir(folder))
+            if i.startswith('chunk_') and (i.endswith('.arrow') or i.endswith('.npz'))
+        ]
+
+    def append(self, names, index, values):
+        """
+        Save a new chunk.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            Column names.
+        index : 1d array[int]
+            Sample indices.
+        values : 2d array
+            Values by sample and column.
+
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        file = os.path.join(self.folder, f'chunk_{len(self.chunk_files()):06d}{self.extension}')
+        temporary_file = file + '.tmp'
+        index = np.asarray(index, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        if pa is None:
+            with open(temporary_file, 'wb') as f:
+                np.savez(f, names=np.array(names), index=index, values=values)
+        else:
+            table = pa.table({'index': index, **{j: values[:, i] for i, j in enumerate(names)}})
+            with pa.OSFile(temporary_file, 'wb') as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        os.replace(temporary_file, file) # Chunks are either complete or missing
+
+    def load(self, names):
+        """
+        Return sample indices (1d array) and values by sample and column
+        (2d array) of all chunks.
+
+        Raises
+        ------
+        ValueError
+            If the columns of a chunk do not match the given names.
+
+        """
+        names = list(names)
+        indices = []
+        values = []
+        for file in self.chunk_files():
+            if file.endswith('.npz'):
+                with np.load(file) as data:
+                    chunk_names = data['names'].tolist()
+                    index = data['index']
+                    chunk_values = data['values']
+            else:
+                if pa is None: raise RuntimeError(f"pyarrow is required to load '{file}'")
+                with pa.memory_map(file) as source:
+                    table = ipc.open_file(source).read_all()
+                chunk_names = table.column_names[1:]
+                index = table.column('index').to_numpy()
+                chunk_values = np.column_stack([table.column(i).to_numpy() for i in chunk_names]) if chunk_names else np.zeros([len(index), 0])
+            if chunk_names != names: raise ValueError(f"columns of '{file}' do not match")
+            indices.append(index)
+            values.append(chunk_values)
+        if indices:
+            return np.concatenate(indices), np.vstack(values)
+        else:
+            return np.zeros(0, dtype=np.int64), np.zeros([0, len(names)])
+
+    def to_frame(self, names):
+        """Return a DataFrame of all saved results sorted by sample index."""
+        index, values = self.load(names)
+        return pd.DataFrame(values, index=index, columns=names).sort_index()
+
+    def clear(self):
+        """Remove all chunks."""
+        for file in self.chunk_files(): os.remove(file)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.folder!r})"
+
+
+def evaluate_with_checkpoints(model, store, checkpoint=20, notify=0,
+                              convergence_model=None, correlation=None, **kwargs):
+    """
+    Evaluate metrics over the loaded samples of a model and save values to
+    its table. Results are appended to the store every `checkpoint` samples
+    and previously saved results are loaded (i.e., the evaluation resumes
+    from the last checkpoint).
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    store : CheckpointStore|None
+        Store of evaluation results. If None, results are not saved.
+    checkpoint : int, optional
+        Number of samples between checkpoints. Defaults to 20.
+    notify : int, optional
+        If 1 or greater, notify elapsed time (and the strongest correlation
+        estimated so far, if `correlation` is given) after the given number
+        of sample evaluations.
+    convergence_model : ConvergencePredictionModel, optional
+        A prediction model for accelerated system convergence.
+    correlation : SpearmanAccumulator, optional
+        Accumulator of rank correlations updated with all loaded and
+        evaluated results every `checkpoint` samples.
+    kwargs : dict
+        Any keyword arguments passed to :func:`biosteam.System.simulate`.
+
+    Raises
+    ------
+    ValueError
+        If the samples in the store do not match the loaded samples.
+    RuntimeError
+        If the private model API used to evaluate single samples is not
+        supported by the installed BioSTEAM version (see `check_model_api`).
+
+    """
+    from blocs.incentives.model import check_model_api
+    check_model_api(('_evaluate_sample', '_samples', '_index'))
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    table = model.table
+    N_parameters = len(model.parameters)
+    metric_columns = [i.index for i in model.metrics]
+    names = [get_column_name(i) for i in table.columns]
+    if store is None:
+        index = np.zeros(0, dtype=np.int64)
+    else:
+        index, values = store.load(names)
+    metric_values = table[metric_columns].values.copy()
+    if index.size:
+        if (index >= len(samples)).any() or not np.array_equal(values[:, :N_parameters], samples[index]):
+            raise ValueError('samples in checkpoint store do not match loaded samples')
+        metric_values[index] = values[:, N_parameters:]
+        if correlation is not None: correlation.update(samples[index], metric_values[index])
+    evaluated = set(index.tolist())
+    remaining = [i for i in model._index if i not in evaluated]
+    if notify:
+        from biosteam.utils import TicToc
+        timer = TicToc()
+        timer.tic()
+    chunk = []
+    def save_chunk():
+        if store is not None:
+            store.append(names, chunk, np.hstack([samples[chunk], metric_values[chunk]]))
+        if correlation is not None:
+            correlation.update(samples[chunk], metric_values[chunk])
+        chunk.clear()
+    try:
+        for count, i in enumerate(remaining, len(evaluated) + 1):
+            metric_values[i] = model._evaluate_sample(samples[i], convergence_model, **kwargs)
+            chunk.append(i)
+            if len(chunk) >= checkpoint: save_chunk()
+            if notify and not count % notify:
+                print(get_progress_note(count, timer, correlation))
+    finally:
+        if chunk: save_chunk()
+        table[metric_columns] = metric_values
+    return table
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming estimates of Spearman's rank correlation coefficients between the
+parameters and metrics of a model. Samples are accumulated in chunks as they
+are evaluated, so correlations are available during long evaluations without
+keeping or re-ranking the full table.
+
+"""
+import numpy as np
+import pandas as pd
+
+__all__ = (
+    'SpearmanAccumulator',
+)
+
+class SpearmanAccumulator:
+    """
+    Create a SpearmanAccumulator object that estimates Spearman's rank
+    correlation coefficients between parameters and metrics from chunks of
+    evaluated samples. Memory is bounded by the number of parameters, metrics,
+    and bins (i.e., it does not depend on the number of samples).
+
+    Parameters
+    ----------
+    parameters : Iterable[Parameter]
+        Parameters with distributions.
+    metrics : Iterable[Metric]
+        Metrics to be correlated with parameters.
+    bins : int, optional
+        Number of bins of metric values. Defaults to 256.
+    warmup : int, optional
+        Number of samples kept to set the bins of metric values. Defaults to
+        four times the number of bins.
+
+    Notes
+    -----
+    Parameter ranks are given by the cumulative distribution function of
+    their distributions, which is exact for samples drawn from these
+    distributions (e.g., Latin hypercube samples). Metric ranks are
+    interpolated within bins set at quantiles of the first samples (until
+    then, correlations are exact). NaN metric values are omitted.
+
+    Estimates are meant to monitor long evaluations. Parameter ranks are
+    wrong for samples that are not drawn from the distributions (e.g.,
+    samples loaded from a file), so results to be reported should be
+    computed exactly from the complete table with `Model.spearman_r`.
+
+    Examples
+    --------
+    >>> correlation = SpearmanAccumulator(model.parameters, model.metrics) # doctest: +SKIP
+    >>> blc.evaluate_with_checkpoints(model, store, correlation=correlation) # doctest: +SKIP
+    >>> rho, p = correlation.spearman_r() # doctest: +SKIP
+
+    """
+    __slots__ = (
+        'parameters', 'metrics', 'bins', 'warmup', 'size',
+        '_buffer', # list[tuple[2d array, 2d array]] Samples until bins are set.
+        '_edges', # [2d array] Bin edges by metric.
+        '_counts', # [2d array] Number of samples by metric and bin.
+        '_positions', # [2d array] Sum of positions within bins by metric and bin.
+        '_squared_positions', # [2d array] Sum of squared positions within bins by metric and bin.
+        '_ranks', # [3d array] Sum of parameter ranks by parameter, metric, and bin.
+        '_ranks_positions', # [3d array] Sum of parameter ranks times positions within bins by parameter, metric, and bin.
+        '_rank_sums', # [2d array] Sum of parameter ranks by parameter and metric.
+        '_squared_rank_sums', # [2d array] Sum of squared parameter ranks by parameter and metric.
+    )
+
+    def __init__(self, parameters, metrics, bins=256, warmup=None):
+        self.parameters = parameters = tuple(parameters)
+        self.metrics = metrics = tuple(metrics)
+        for i in parameters:
+            if i.distribution is None: raise ValueError(f"parameter '{i.name}' has no distribution")
+        self.bins = bins
+        self.warmup = 4 * bins if warmup is None else warmup
+        #: [int] Number of accumulated samples.
+        self.size = 0
+        self._buffer = []
+        self._edges = None
+        P = len(parameters)
+        M = len(metrics)
+        B = 2 * bins - 1 # Intervals and edges
+        self._counts = np.zeros([M, B])
+        self._positions = np.zeros([M, B])
+        self._squared_positions = np.zeros([M, B])
+        self._ranks = np.zeros([P, M, B])
+        self._ranks_positions = np.zeros([P, M, B])
+        self._rank_sums = np.zeros([P, M])
+        self._squared_rank_sums = np.zeros([P, M])
+
+    def _parameter_ranks(self, samples):
+        return np.column_stack([
+            i.distribution.fwd(samples[:, n]) for n, i in enumerate(self.parameters)
+        ]) if self.parameters else np.zeros([len(samples), 0])
+
+    def update(self, samples, values):
+        """
+        Accumulate a chunk of evaluated samples.
+
+        Parameters
+        ----------
+        samples : 2d array
+            Parameter values by sample and parameter.
+        values : 2d array
+            Metric values by sample and metric.
+
+        """
+        samples = np.asarray(samples, dtype=float).reshape([-1, len(self.parameters)])
+        values = np.asarray(values, dtype=float).reshape([-1, len(self.metrics)])
+        self.size += len(samples)
+        if self._edges is None:
+            self._buffer.append((samples, values))
+            if self.size < self.warmup: return
+            samples = np.vstack([i for i, j in self._buffer])
+            values = np.vstack([j for i, j in self._buffer])
+            self._buffer = []
+            self._set_edges(values)
+        self._accumulate(self._parameter_ranks(samples), values)
+
+    def _set_edges(self, values):
+        # Edges are unique quantiles (padded with infinity); values equal to
+        # an edge (e.g., many samples with the same value) are tied in a bin
+        # of their own
+        quantiles = np.linspace(0, 1, self.bins + 1)[1:-1]
+        edges = np.full([len(self.metrics), self.bins + 1], np.inf)
+        edges[:, 0] = -np.inf
+        for m, metric_values in enumerate(values.transpose()):
+            metric_values = metric_values[~np.isnan(metric_values)]
+            if not metric_values.size: continue
+            unique = np.unique(np.quantile(metric_values, quantiles))
+            edges[m, 1:unique.size + 1] = unique
+        self._edges = edges
+
+    def _accumulate(self, ranks, values):
+        # Bins alternate between intervals and edges (i.e., 0: below the
+        # first edge, 1: at the first edge, 2: between the first and second
+        # edges, ...)
+        bins = 2 * self.bins - 1
+        N, M = values.shape
+        valid = ~np.isnan(values)
+        bin_index = np.zeros([N, M], dtype=int)
+        positions = np.full([N, M], 0.5)
+        for m, (metric_values, edges) in enumerate(zip(values.transpose(), self._edges)):
+            index = np.searchsorted(edges, metric_values, side='left')
+            index[~valid[:, m]] = 1
+            tied = metric_values == edges[index]
+            bin_index[:, m] = 2 * (index - 1) + tied
+            lower = edges[index - 1]
+            width = edges[index] - lower
+            inner = ~tied & np.isfinite(width) & valid[:, m]
+            positions[inner, m] = (metric_values[inner] - lower[inner]) / width[inner]
+        positions[~valid] = 0.
+        flat_index = (bin_index + bins * np.arange(M)).ravel()
+        weights = valid.ravel().astype(float)
+        flat_positions = positions.ravel()
+        size = M * bins
+        self._counts += np.bincount(flat_index, weights, size).reshape([M, bins])
+        self._positions += np.bincount(flat_index, flat_positions, size).reshape([M, bins])
+        self._squared_positions += np.bincount(flat_index, flat_positions * flat_positions, size).reshape([M, bins])
+        for p, parameter_ranks in enumerate(ranks.transpose()):
+            weighted_ranks = (valid * parameter_ranks[:, None]).ravel()
+            self._ranks[p] += np.bincount(flat_index, weighted_ranks, size).reshape([M, bins])
+            self._ranks_positions[p] += np.bincount(flat_index, weighted_ranks * flat_positions, size).reshape([M, bins])
+        self._rank_sums += ranks.transpose() @ valid
+        self._squared_rank_sums += (ranks * ranks).transpose() @ valid
+
+    def rho(self):
+        """
+        Return Spearman's rank correlation coefficients (2d array; parameters
+        x metrics) of all accumulated samples.
+        """
+        if self._edges is None:
+            from scipy.stats import spearmanr
+            P = len(self.parameters)
+            M = len(self.metrics)
+            rho = np.full([P, M], np.nan)
+            if not self._buffer: return rho
+            samples = np.vstack([i for i, j in self._buffer])
+            values = np.vstack([j for i, j in self._buffer])
+            for m, y in enumerate(values.transpose()):
+                index = ~np.isnan(y)
+                if index.sum() < 2: continue
+                for p, x in enumerate(samples.transpose()):
+                    rho[p, m] = spearmanr(x[index], y[index])[0]
+            return rho
+        # Metric ranks are (n_before + n_bin * position) / n, where n_before
+        # is the number of samples in lower bins and position is linearly
+        # interpolated within the bin
+        counts = self._counts
+        N = counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            before = np.cumsum(counts, axis=1) - counts
+            metric_rank_sums = (before * counts + counts * self._positions).sum(axis=1) / N
+            squared_metric_rank_sums = (
+                before * before * counts
+                + 2 * before * counts * self._positions
+                + counts * counts * self._squared_positions
+            ).sum(axis=1) / (N * N)
+            product_sums = (before * self._ranks + counts * self._ranks_positions).sum(axis=2) / N
+            mean_ranks = self._rank_sums / N
+            mean_metric_ranks = metric_rank_sums / N
+            covariance = product_sums / N - mean_ranks * mean_metric_ranks
+            variance = self._squared_rank_sums / N - mean_ranks * mean_ranks
+            metric_variance = squared_metric_rank_sums / N - mean_metric_ranks * mean_metric_ranks
+            rho = covariance / np.sqrt(variance * metric_variance)
+        return np.clip(rho, -1., 1.)
+
+    def spearman_r(self):
+        """
+        Return two DataFrame objects of Spearman's rho and p-values between
+        metrics and parameters (in the same format as `Model.spearman_r`).
+        """
+        from scipy.stats import t
+        rho = self.rho()
+        if self._edges is None:
+            N = np.array([
+                (~np.isnan(j)).sum(axis=0) for i, j in self._buffer
+            ]).sum(axis=0) if self._buffer else np.zeros(len(self.metrics))
+        else:
+            N = self._counts.sum(axis=1)
+        dof = N - 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            statistic = rho * np.sqrt(dof / ((1. - rho) * (1. + rho)))
+            p = 2 * t.sf(np.abs(statistic), dof)
+        p[np.abs(rho) == 1.] = 0.
+        index = pd.MultiIndex.from_tuples([i.index for i in self.parameters], names=('Element', 'Parameter'))
+        columns = pd.MultiIndex.from_tuples([i.index for i in self.metrics], names=('Element', 'Metric'))
+        return pd.DataFrame(rho, index=index, columns=columns), pd.DataFrame(p, index=index, columns=columns)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.parameters)} parameters, {len(self.metrics)} metrics, {self.size} samples>"
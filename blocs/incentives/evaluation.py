@@ -18,15 +18,176 @@ import os
 
 #Import state scenario data
 folder = os.path.dirname(__file__)
-st_data_file = os.path.join(folder, 'state_scenarios_for_import.xlsx')
-st_data = pd.read_excel(st_data_file, index_col=[0])
+state_table = blc.load_state_table()
+state_incentives = blc.load_state_incentives()
 results_folder = os.path.join(folder, 'results')
 
+# State scenarios ==============================================================
+
+def get_state_incentive_numbers(state, biorefinery):
+    """Return the incentive numbers available to a biorefinery in a state."""
+    return state_incentives.get(state, biorefinery)
+
+def get_state_scenario(state, biorefinery, incentives=False):
+    """Return TEA attributes by name for a state scenario."""
+    return {
+        **state_table.scenario(state, biorefinery),
+        'incentive_numbers': get_state_incentive_numbers(state, biorefinery) if incentives else (),
+        'state_tax_by_gross_receipts': state in ('Ohio', 'Texas'),
+        'deduct_federal_income_tax_to_state_taxable_earnings': state in ('Alabama', 'Louisiana'),
+        'deduct_half_federal_income_tax_to_state_taxable_earnings': state in ('Iowa', 'Missouri'),
+    }
+
+def solve_states_MFSP(tea, biorefinery, states, return_incentive_values=False, IRRs=None):
+    """
+    Return the MFSP [USD/gal] without and with state incentives as a 2d array
+    (states x 2), or as a 3d array (states x 2 x IRRs) if IRRs are given. All
+    state cash flows are solved simultaneously from the current simulation of
+    the biorefinery.
+
+    Parameters
+    ----------
+    tea : CellulosicIncentivesTEA|ConventionalIncentivesTEA
+        TEA of a converged biorefinery.
+    biorefinery : str
+        Either 'corn', 'cornstover', or 'sugarcane'.
+    states : Iterable[str]
+        State names.
+    return_incentive_values : bool, optional
+        Whether to also return the total value of incentives [USD] for each
+        state (and IRR, if given).
+    IRRs : 1d array, optional
+        Internal rates of return. Defaults to the IRR of the TEA.
+
+    """
+    states = list(states)
+    N = len(states)
+    scenarios = [get_state_scenario(i, biorefinery) for i in states]
+    scenarios += [get_state_scenario(i, biorefinery, True) for i in states]
+    prices, incentives = tea.solve_price_across_scenarios(tea.ethanol_product, scenarios, IRRs)
+    MFSPs = 2.98668849 * prices.reshape([2, N, *prices.shape[1:]]).swapaxes(0, 1)
+    if return_incentive_values:
+        return MFSPs, incentives[:, N:].sum(axis=(0, -1))
+    else:
+        return MFSPs
+
+def solve_incentives_MFSP(tea, incentive_numbers=None):
+    """
+    Return the MFSP [USD/gal] with each incentive alone (1d array) and the
+    total exemptions, deductions, credits, and refunds [USD] of each incentive
+    (2d array; incentives x 4). All incentive cash flows are solved
+    simultaneously from the current simulation of the biorefinery.
+
+    Parameters
+    ----------
+    tea : CellulosicIncentivesTEA|ConventionalIncentivesTEA
+        TEA of a converged biorefinery.
+    incentive_numbers : Iterable[int], optional
+        Incentives to evaluate. Defaults to all registered incentives.
+
+    """
+    if incentive_numbers is None: incentive_numbers = sorted(blc.INCENTIVES)
+    scenarios = [{'incentive_numbers': (i,)} for i in incentive_numbers]
+    prices, incentives = tea.solve_price_across_scenarios(tea.ethanol_product, scenarios)
+    return 2.98668849 * prices, incentives.sum(axis=2).transpose()
+
+def optimize_state_incentives(tea, biorefinery, states, candidates=None,
+                              max_incentives=None, tolerance=1e-4):
+    """
+    Return the MFSP-minimizing portfolio of incentives of each state as a
+    DataFrame object (states x ['Incentives', 'MFSP', 'MFSP without
+    incentives', 'Portfolios solved']). Among portfolios within the
+    tolerance of the minimum MFSP, the smallest is chosen (i.e., incentives
+    that add nothing once taxes are exhausted are left out). Portfolios of
+    all states are solved simultaneously (see `solve_states_MFSP`) from the
+    current simulation of the biorefinery.
+
+    Parameters
+    ----------
+    tea : CellulosicIncentivesTEA|ConventionalIncentivesTEA
+        TEA of a converged biorefinery.
+    biorefinery : str
+        Either 'corn', 'cornstover', or 'sugarcane'.
+    states : Iterable[str]
+        State names.
+    candidates : Iterable[int], optional
+        Incentives considered in every state. Defaults to the incentives
+        available in each state.
+    max_incentives : int, optional
+        Maximum number of incentives in a portfolio. Defaults to no limit.
+    tolerance : float, optional
+        MFSP tolerance [USD/gal]. Defaults to 1e-4.
+
+    Notes
+    -----
+    Portfolios are enumerated by size with branch-and-bound. Incentives are
+    nonnegative (negative amounts are clipped to zero when assessed) and do
+    not affect taxes, so adding incentives never increases the MFSP, but
+    incentives are capped by the tax of each year. Thus, the MFSP with all
+    remaining candidates of a portfolio (where the tax cap applies) bounds
+    the MFSP of all portfolios that extend it. Portfolios that cannot improve
+    on the best portfolio by more than the tolerance are not extended, and
+    the search of a state ends once the best portfolio is within the
+    tolerance of the MFSP with all candidates.
+
+    """
+    states = list(states)
+    scenarios = {i: get_state_scenario(i, biorefinery) for i in states}
+    if candidates is None:
+        candidates = {i: tuple(sorted(get_state_incentive_numbers(i, biorefinery))) for i in states}
+    else:
+        candidates = dict.fromkeys(states, tuple(sorted(set(candidates))))
+    if max_incentives is None: max_incentives = max([len(i) for i in candidates.values()], default=0)
+    MFSPs = {} # (state, incentive numbers) -> MFSP
+
+    def solve(keys):
+        keys = [i for i in dict.fromkeys(keys) if i not in MFSPs]
+        if not keys: return
+        prices = tea.solve_price_across_scenarios(
+            tea.ethanol_product,
+            [{**scenarios[state], 'incentive_numbers': numbers} for state, numbers in keys],
+        )[0]
+        for key, price in zip(keys, 2.98668849 * prices): MFSPs[key] = price
+
+    def bound(state, numbers):
+        # Portfolio with all remaining candidates
+        last = numbers[-1] if numbers else -1
+        return (state, numbers + tuple([i for i in candidates[state] if i > last]))
+
+    # Each portfolio is solved together with its bound
+    nodes = [(i, ()) for i in states]
+    solve([*nodes, *[bound(*i) for i in nodes]])
+    best = {i: () for i in states}
+    for size in range(1, max_incentives + 1):
+        children = []
+        for state, numbers in nodes:
+            best_MFSP = MFSPs[state, best[state]]
+            if MFSPs[bound(state, ())] >= best_MFSP - tolerance: continue # Search of state is done
+            if MFSPs[bound(state, numbers)] >= best_MFSP - tolerance: continue # Pruned
+            last = numbers[-1] if numbers else -1
+            children.extend([(state, numbers + (i,)) for i in candidates[state] if i > last])
+        if not children: break
+        solve([*children, *[bound(*i) for i in children if size < max_incentives]])
+        for state, numbers in children:
+            MFSP = MFSPs[state, numbers]
+            best_numbers = best[state]
+            best_MFSP = MFSPs[state, best_numbers]
+            if (MFSP < best_MFSP - tolerance
+                or len(best_numbers) == size and MFSP < best_MFSP):
+                best[state] = numbers
+        nodes = children
+    return pd.DataFrame(
+        {'Incentives': [best[i] for i in states],
+         'MFSP': [MFSPs[i, best[i]] for i in states],
+         'MFSP without incentives': [MFSPs[i, ()] for i in states],
+         'Portfolios solved': [sum([i == state for state, numbers in MFSPs]) for i in states]},
+        index=pd.Index(states, name='State'),
+    )
+
 # Model for state specific analysis ===========================================
 def create_states_model(biorefinery):
     biorefinery = biorefinery.lower()
     if biorefinery == 'corn':
-        name = 'CN'
         tea = blc.create_corn_tea()
         all_states = [
                     'Alabama',
@@ -71,24 +232,8 @@ def create_states_model(biorefinery):
                     'Wisconsin',
                     'Wyoming',
                     ]
-        states_w_inc = [
-                        'Alabama',
-                        'Colorado',
-                        'Iowa',
-                        'Kansas',
-                        'Kentucky',
-                        'Louisiana',
-                        'Montana',
-                        'Nebraska',
-                        'New Mexico',
-                        'Oregon',
-                        'South Carolina',
-                        'Utah',
-                        'Virginia',
-                        ]
 
     elif biorefinery == 'cornstover':
-        name = 'CS'
         tea = blc.create_cornstover_tea()
         all_states = [
                     'Alabama',
@@ -129,24 +274,8 @@ def create_states_model(biorefinery):
                     'West Virginia',
                     'Wisconsin',
                     ]
-        states_w_inc = [
-                        'Alabama',
-                        'Colorado',
-                        'Iowa',
-                        'Kansas',
-                        'Kentucky',
-                        'Louisiana',
-                        'Montana',
-                        'Nebraska',
-                        'New Mexico',
-                        'Oregon',
-                        'South Carolina',
-                        'Utah',
-                        'Virginia',
-                        ]
 
     elif biorefinery == 'sugarcane':
-        name = 'SC'
         tea = blc.create_sugarcane_tea()
         all_states = [
             'Florida',
@@ -154,16 +283,13 @@ def create_states_model(biorefinery):
             'Louisiana',
             'Texas',
             ]
-        states_w_inc = [
-            'Hawaii',
-            'Louisiana'
-            ]
     else:
         raise ValueError("invalid biorefinery; must be either "
                          "'corn', 'cornstover', or 'sugarcane'")
+    states_w_inc = [i for i in all_states if get_state_incentive_numbers(i, biorefinery)]
 
-    model = bst.Model(tea.system, exception_hook='raise')
-    bst.PowerUtility.price = 0.0681
+    model = blc.IncentivesModel(tea.system, exception_hook='raise')
+    tea.electricity_price = 0.0681
     bst.CE = 596.2
     tea.fuel_tax = 0.
     tea.sales_tax = 0.05785
@@ -176,151 +302,30 @@ def create_states_model(biorefinery):
     else:
         tea.jobs_50 = 50 # assumption made by Humbird (2011) and Huang (2016)
 
-    def get_state_incentives(state):
-            avail_incentives = st_data.loc[state]['Incentives Available']
-            avail_incentives = None if pd.isna(avail_incentives) else avail_incentives # no incentives
-            if avail_incentives is not None:
-                try: # multiple incentives
-                    avail_incentives = [int(i) for i in avail_incentives if i.isnumeric()]
-                except TypeError: # only one incentive
-                    avail_incentives = [int(avail_incentives)]
-            return avail_incentives
-
-    def solve_price():
-        try:
-            MFSP = tea.solve_price(tea.ethanol_product)
-        except:
-            MFSP = tea.solve_price([tea.ethanol_product], [4])
-        return 2.98668849 * MFSP
+    # MFSPs of all states are solved at once (from the same simulation) by
+    # the first state metric evaluated for each sample (i.e., regardless of
+    # the order or subset of metrics evaluated)
+    results = {}
+    solved_key = [None] # Sample key of the results
+
+    def get_results():
+        key = model.sample_key
+        if key is None or key is not solved_key[0]:
+            MFSPs, inc_values = solve_states_MFSP(
+                tea, biorefinery, all_states, return_incentive_values=True
+            )
+            for i, j, k in zip(all_states, MFSPs, inc_values): results[i] = (*j, k)
+            solved_key[0] = key
+        return results
 
     def MFSP_getter(state):
-        def MFSP():
-            names = (
-                 'state_income_tax',
-                 'property_tax',
-                 'fuel_tax',
-                 'sales_tax',
-                 'F_investment',
-                 'state_tax_by_gross_receipts',
-                 'deduct_federal_income_tax_to_state_taxable_earnings',
-                 'deduct_half_federal_income_tax_to_state_taxable_earnings',
-                 'incentive_numbers',
-             )
-            original_feedstock_price = tea.feedstock.price
-            original_electricity_price = bst.PowerUtility.price
-            dct = {i: getattr(tea, i) for i in names}
-            tea.state_income_tax = st_data.loc[state]['Income Tax Rate (decimal)']
-            tea.property_tax = st_data.loc[state]['Property Tax Rate (decimal)']
-            tea.fuel_tax = st_data.loc[state]['State Motor Fuel Tax (decimal)']
-            tea.sales_tax = st_data.loc[state]['State Sales Tax Rate (decimal)']
-            bst.PowerUtility.price = st_data.loc[state]['Electricity Price (USD/kWh)']
-            tea.F_investment = st_data.loc[state]['Location Capital Cost Factor (dimensionless)']
-            tea.incentive_numbers = ()
-            tea.feedstock.price = st_data.loc[state][f'{name} Price (USD/kg)']
-
-            if state == 'Ohio' or state == 'Texas':
-                tea.state_tax_by_gross_receipts = True
-            else:
-                tea.state_tax_by_gross_receipts = False
-
-            if state == 'Alabama' or state == 'Louisiana':
-                tea.deduct_federal_income_tax_to_state_taxable_earnings = True
-            else:
-                tea.deduct_federal_income_tax_to_state_taxable_earnings = False
-
-            if state == 'Iowa' or state == 'Missouri':
-                tea.deduct_half_federal_income_tax_to_state_taxable_earnings = True
-            else:
-                tea.deduct_half_federal_income_tax_to_state_taxable_earnings = False
-
-            MFSP = solve_price()
-            tea.feedstock.price = original_feedstock_price
-            bst.PowerUtility.price = original_electricity_price
-            for i in names: setattr(tea, i, dct[i])
-            return MFSP
-        return MFSP
+        return lambda: get_results()[state][0]
 
     def MFSP_w_inc_getter(state):
-        def MFSP():
-            names = (
-                 'state_income_tax',
-                 'property_tax',
-                 'fuel_tax',
-                 'sales_tax',
-                 'F_investment',
-                 'state_tax_by_gross_receipts',
-                 'deduct_federal_income_tax_to_state_taxable_earnings',
-                 'deduct_half_federal_income_tax_to_state_taxable_earnings',
-                 'incentive_numbers',
-             )
-            original_feedstock_price = tea.feedstock.price
-            original_electricity_price = bst.PowerUtility.price
-            dct = {i: getattr(tea, i) for i in names}
-            tea.state_income_tax = st_data.loc[state]['Income Tax Rate (decimal)']
-            tea.property_tax = st_data.loc[state]['Property Tax Rate (decimal)']
-            tea.fuel_tax = st_data.loc[state]['State Motor Fuel Tax (decimal)']
-            tea.sales_tax = st_data.loc[state]['State Sales Tax Rate (decimal)']
-            bst.PowerUtility.price = st_data.loc[state]['Electricity Price (USD/kWh)']
-            tea.F_investment = st_data.loc[state]['Location Capital Cost Factor (dimensionless)']
-            # tea.incentive_numbers = get_state_incentives(state)
-            tea.feedstock.price = st_data.loc[state][f'{name} Price (USD/kg)']
-
-            if state == 'Ohio' or state == 'Texas':
-                tea.state_tax_by_gross_receipts = True
-            else:
-                tea.state_tax_by_gross_receipts = False
-
-            if state == 'Alabama' or state == 'Louisiana':
-                tea.deduct_federal_income_tax_to_state_taxable_earnings = True
-            else:
-                tea.deduct_federal_income_tax_to_state_taxable_earnings = False
-
-            if state == 'Iowa' or state == 'Missouri':
-                tea.deduct_half_federal_income_tax_to_state_taxable_earnings = True
-            else:
-                tea.deduct_half_federal_income_tax_to_state_taxable_earnings = False
-
-            if state == 'Alabama':
-                tea.incentive_numbers = (7,)
-            elif state == 'Colorado':
-                tea.incentive_numbers = (8,)
-            elif state == 'Hawaii':
-                tea.incentive_numbers = (9,)
-            elif state == 'Iowa':
-                tea.incentive_numbers = (1,10,18)
-            elif state == 'Kansas':
-                tea.incentive_numbers = (2,)
-            elif state == 'Kentucky':
-                if biorefinery == 'sugarcane':
-                    tea.incentive_numbers = (11,19)
-                else:
-                    tea.incentive_numbers = (11,12,19)
-            elif state == 'Louisiana':
-                tea.incentive_numbers = (13,)
-            elif state == 'Montana':
-                if biorefinery == 'corn':
-                    tea.incentive_numbers = (3,20)
-                else:
-                    tea.incentive_numbers = (3,)
-            elif state == 'Nebraska':
-                tea.incentive_numbers = (4,)
-            elif state == 'New Mexico':
-                tea.incentive_numbers = (6,)
-            elif state == 'Oregon':
-                tea.incentive_numbers = (5,)
-            elif state == 'South Carolina':
-                tea.incentive_numbers = (14,15)
-            elif state == 'Utah':
-                tea.incentive_numbers = (16,)
-            elif state == 'Virginia':
-                tea.incentive_numbers = (17,)
-
-            MFSP = solve_price()
-            tea.feedstock.price = original_feedstock_price
-            bst.PowerUtility.price = original_electricity_price
-            for i in names: setattr(tea, i, dct[i])
-            return MFSP
-        return MFSP
+        return lambda: get_results()[state][1]
+
+    def inc_value_getter(state):
+        return lambda: get_results()[state][2]
 
     @model.metric(name='Utility cost', units='10^6 USD/yr')
     def get_utility_cost():
@@ -338,34 +343,27 @@ def create_states_model(biorefinery):
     def get_TCI():
         return tea.TCI
 
+    baseline_scenario = tea.compile_scenario(dict(
+        state_income_tax=0,
+        property_tax=0.001,
+        fuel_tax=0,
+        sales_tax=0,
+        F_investment=1,
+        incentive_numbers=(),
+        electricity_price=0.0571675,
+    ))
+
     @model.metric(name="Baseline MFSP", units='USD/gal') #within this function, set whatever parameter values you want to use as the baseline
     def MFSP_baseline():
-        names = (
-            'state_income_tax', 'property_tax', 'fuel_tax', 'sales_tax', 'F_investment',
-            'incentive_numbers',
-        )
-        dct_old = {i: getattr(tea, i) for i in names}
-        tea.state_income_tax = 0
-        tea.property_tax = 0.001
-        tea.fuel_tax = 0
-        tea.sales_tax = 0
-        tea.F_investment = 1
-        tea.incentive_numbers = ()
-        old_price = bst.PowerUtility.price
-        bst.PowerUtility.price = 0.0571675
-        MFSP = 2.98668849 * tea.solve_price(tea.ethanol_product)
-        for i, j in dct_old.items(): setattr(tea, i, j)
-        bst.PowerUtility.price = old_price
-        return MFSP
-
-    get_inc_value = lambda: tea.exemptions.sum() + tea.deductions.sum() + tea.credits.sum()+ tea.refunds.sum()
+        with baseline_scenario:
+            return 2.98668849 * tea.solve_price(tea.ethanol_product)
 
     for state in all_states:
         model.metric(MFSP_getter(state), 'MFSP', 'USD/gal', state)
 
     for state in states_w_inc:
         model.metric(MFSP_w_inc_getter(state), 'Inc MFSP', 'USD/gal', state)
-        model.metric(get_inc_value, 'Inc value', 'USD', state)
+        model.metric(inc_value_getter(state), 'Inc value', 'USD', state)
 
     ### Add Parameters =============================================================
     feedstock = tea.feedstock
@@ -411,9 +409,9 @@ def create_states_model(biorefinery):
             tea.crude_oil.price = price / kg_per_ton
 
         @param(name='Electricity price', element='TEA', kind='isolated', units='USD/kWh',
-               baseline=bst.PowerUtility.price)
+               baseline=tea.electricity_price)
         def set_electricity_price(price):
-            bst.PowerUtility.price = price
+            tea.electricity_price = price
 
     elif biorefinery == 'cornstover':
         cornstover = feedstock
@@ -515,9 +513,9 @@ def create_states_model(biorefinery):
             tea.BT.turbogenerator_efficiency = X / 100.
 
         @param(name='Electricity price', element='TEA', kind='isolated', units='USD/kWh',
-               baseline=bst.PowerUtility.price)
+               baseline=tea.electricity_price)
         def set_electricity_price(price):
-            bst.PowerUtility.price = price
+            tea.electricity_price = price
 
     elif biorefinery == 'sugarcane':
 
@@ -553,20 +551,24 @@ def create_states_model(biorefinery):
             tea.BT.turbogenerator_efficiency = X / 100.
 
         @param(name='Electricity price', element='TEA', kind='isolated', units='USD/kWh',
-               baseline=bst.PowerUtility.price)
+               baseline=tea.electricity_price)
         def set_electricity_price(price):
-            bst.PowerUtility.price = price
+            tea.electricity_price = price
 
     return model
 
-def evaluate_SS(biorefinery, N=3000):
+def evaluate_SS(biorefinery, N=3000, processes=None, export_excel=True):
     model = create_states_model(biorefinery)
     np.random.seed(1688)
     rule = 'L' # For Latin-Hypercube sampling
     samples = model.sample(N, rule)
-    model.load_samples(samples)
-    model.evaluate(**evaluate_args('SS'))
-    model.table.to_excel(get_file_name('SS.xlsx'))
+    if processes:
+        evaluate_in_parallel(model, create_states_model, biorefinery, samples, processes,
+                             store=evaluate_args('SS')['store'])
+    else:
+        model.load_samples(samples)
+        blc.evaluate_with_checkpoints(model, **evaluate_args('SS'))
+    if export_excel: model.table.to_excel(get_file_name('SS.xlsx'))
     return model.table
 
 # Model for analysis by incentivized parameters ===========================================
@@ -588,8 +590,8 @@ def create_IPs_model(biorefinery):
         raise ValueError("invalid biorefinery; must be either "
                          "'corn', 'cornstover', or 'sugarcane'")
 
-    model = bst.Model(tea.system, exception_hook='raise')
-    bst.PowerUtility.price = 0.0681
+    model = blc.IncentivesModel(tea.system, exception_hook='raise')
+    tea.electricity_price = 0.0681
     tea.fuel_tax = 0.
     tea.sales_tax = 0.05785
     tea.federal_income_tax = 0.21
@@ -601,13 +603,56 @@ def create_IPs_model(biorefinery):
     else:
         tea.jobs_50 = 50 # assumption made by Humbird (2011) and Huang (2016)
 
-    def solve_price(set_price=False):
-        MFSP = tea.solve_price(tea.ethanol_product)
+    # Solutions are cached by economic state and cleared at each sample, so
+    # identical cash flow analyses are never repeated within a sample
+    solve_cache = {}
+    economic_attributes = (
+        'incentive_numbers', 'federal_income_tax', 'state_income_tax',
+        'property_tax', 'sales_tax', 'fuel_tax', 'labor_cost', 'F_investment',
+        'state_tax_by_gross_receipts', 'electricity_price',
+    )
+
+    def economic_state(scenario):
+        values = [scenario.get(i, getattr(tea, i)) for i in economic_attributes]
+        values[0] = frozenset(values[0])
+        return (*values, tea.feedstock.price, tea.ethanol_product.price)
+
+    def solve_across_scenarios(scenarios):
+        scenarios = [i for i in scenarios if economic_state(i) not in solve_cache]
+        if not scenarios: return
+        prices, incentives = tea.solve_price_across_scenarios(tea.ethanol_product, scenarios)
+        for scenario, price, values in zip(scenarios, prices, incentives.swapaxes(0, 1)):
+            solve_cache[economic_state(scenario)] = (price, tuple(values))
+
+    def solve_price(set_price=False, **scenario):
+        key = economic_state(scenario)
+        if key in solve_cache:
+            MFSP, (tea.exemptions, tea.deductions, tea.credits, tea.refunds) = solve_cache[key]
+        else:
+            with tea.scenario(scenario):
+                MFSP = tea.solve_price(tea.ethanol_product)
+            solve_cache[key] = (MFSP, (tea.exemptions, tea.deductions, tea.credits, tea.refunds))
         if set_price: tea.ethanol_product.price = MFSP
         return 2.98668849 * MFSP
 
+    # Taxes (and wages) left out to compute their contribution to the MFSP;
+    # all are solved together in a single vectorized pass
+    leave_one_out_scenarios = (
+        dict(state_income_tax=0.),
+        dict(property_tax=0.),
+        dict(sales_tax=0.),
+        dict(fuel_tax=0.05),
+        dict(labor_cost=0.),
+    )
+
+    def solve_leave_one_out(scenario):
+        solve_across_scenarios(leave_one_out_scenarios)
+        return solve_price(**scenario)
+
     @model.metric(name="Baseline MFSP", units='USD/gal') #within this function, set whatever parameter values you want to use as the baseline
     def MFSP_baseline():
+        solve_cache.clear()
+        incentive_sweep.clear()
         tea.incentive_numbers = ()
         # Set price of ethanol so that sales and MFSP contributions are scaled accordingly
         # If ethanol price is not set to baseline, then MFSP contribution of get_inc_tax may be greater that 100% and not consistent between biorefineries
@@ -627,12 +672,6 @@ def create_IPs_model(biorefinery):
 
     @model.metric(name='Total capital investment', units='USD')
     def get_TCI():
-        try:
-            assert tea.TCI < 100e6
-        except:
-            for i in tea.system.units:
-                print(i, i.purchase_cost)
-            breakpoint()
         return tea.TCI
 
     @model.metric(name='Fixed capital investment', units='USD')
@@ -683,35 +722,23 @@ def create_IPs_model(biorefinery):
 
     @model.metric(name='Income Tax Contribution to MFSP', units='%')
     def inc_tax_contribution():
-        param = tea.state_income_tax
-        tea.state_income_tax = 0
-        value = (MFSP_baseline.get() - solve_price())/MFSP_baseline.get() * 100
-        tea.state_income_tax = param
-        return value
+        baseline = MFSP_baseline.get()
+        return (baseline - solve_leave_one_out(leave_one_out_scenarios[0]))/baseline * 100
 
     @model.metric(name='Property Tax Contribution to MFSP', units='%')
     def prop_tax_contribution():
-        param = tea.property_tax
-        tea.property_tax = 0
-        value = (MFSP_baseline.get() - solve_price())/MFSP_baseline.get() * 100
-        tea.property_tax = param
-        return value
+        baseline = MFSP_baseline.get()
+        return (baseline - solve_leave_one_out(leave_one_out_scenarios[1]))/baseline * 100
 
     @model.metric(name='Sales Tax Contribution to MFSP', units='%')
     def sales_tax_contribution():
-        param = tea.sales_tax
-        tea.sales_tax = 0
-        value = (MFSP_baseline.get() - solve_price())/MFSP_baseline.get() * 100
-        tea.sales_tax = param
-        return value
+        baseline = MFSP_baseline.get()
+        return (baseline - solve_leave_one_out(leave_one_out_scenarios[2]))/baseline * 100
 
     @model.metric(name='Fuel Tax Contribution to MFSP', units='%')
     def fuel_tax_contribution():
-        param = tea.fuel_tax
-        tea.fuel_tax = 0.05
-        value = (solve_price() - MFSP_baseline.get())/solve_price() * 100
-        tea.fuel_tax = param
-        return value
+        MFSP = solve_leave_one_out(leave_one_out_scenarios[3])
+        return (MFSP - MFSP_baseline.get())/MFSP * 100
 
     @model.metric(name="Ethanol production cost", units='USD/gal')
     def ethanol_production_cost():
@@ -723,38 +750,36 @@ def create_IPs_model(biorefinery):
 
     @model.metric(name='Wages Contribution to MFSP', units='%')
     def wage_contribution():
-        param = tea.labor_cost
-        tea.labor_cost = 0
-        value = (MFSP_baseline.get() - solve_price())/MFSP_baseline.get() * 100
-        tea.labor_cost = param
-        return value
-
-    get_exemptions = lambda: tea.exemptions.sum()
-    get_deductions = lambda: tea.deductions.sum()
-    get_credits = lambda: tea.credits.sum()
-    get_refunds = lambda: tea.refunds.sum()
-
-    def MFSP_getter(incentive_number):
-        def MFSP():
-            tea.incentive_numbers = (incentive_number,)
-            return solve_price()
-        return MFSP
-
-    def MFSP_reduction_getter(incentive_number):
-        def MFSP():
-            tea.incentive_numbers = (incentive_number,)
-            return (solve_price() - MFSP_baseline.get())/MFSP_baseline.get() * 100
-        return MFSP
-
-
-    for incentive_number in range(1, 21):
+        baseline = MFSP_baseline.get()
+        return (baseline - solve_leave_one_out(leave_one_out_scenarios[4]))/baseline * 100
+
+    # All single-incentive MFSPs are solved once per sample in a single
+    # batched solve; metrics of each incentive read from this result
+    incentive_numbers = tuple(range(1, 21))
+    incentive_sweep = {}
+
+    def get_incentive_sweep():
+        if not incentive_sweep:
+            baseline = MFSP_baseline.get()
+            MFSPs, totals = solve_incentives_MFSP(tea, incentive_numbers)
+            for incentive_number, MFSP, values in zip(incentive_numbers, MFSPs, totals):
+                incentive_sweep[incentive_number] = (
+                    MFSP, (MFSP - baseline)/baseline * 100, *values
+                )
+        return incentive_sweep
+
+    def incentive_sweep_getter(incentive_number, index):
+        return lambda: get_incentive_sweep()[incentive_number][index]
+
+    for incentive_number in incentive_numbers:
         element = f"Incentive {incentive_number}"
-        model.metric(MFSP_getter(incentive_number), 'MFSP', 'USD/gal', element)
-        model.metric(MFSP_reduction_getter(incentive_number), 'MFSP Reduction','%', element)
-        model.metric(get_exemptions, 'Exemptions', 'USD', element)
-        model.metric(get_deductions, 'Deductions', 'USD', element)
-        model.metric(get_credits, 'Credits', 'USD', element)
-        model.metric(get_refunds, 'Refunds', 'USD', element)
+        for index, (name, units) in enumerate([('MFSP', 'USD/gal'),
+                                               ('MFSP Reduction', '%'),
+                                               ('Exemptions', 'USD'),
+                                               ('Deductions', 'USD'),
+                                               ('Credits', 'USD'),
+                                               ('Refunds', 'USD')]):
+            model.metric(incentive_sweep_getter(incentive_number, index), name, units, element)
 
     ### Add Parameters =============================================================
     feedstock = tea.feedstock
@@ -843,9 +868,9 @@ def create_IPs_model(biorefinery):
             tea.crude_oil.price = price / kg_per_ton
 
         @param(name='Electricity price', element='TEA', kind='isolated', units='USD/kWh',
-                baseline=bst.PowerUtility.price)
+                baseline=tea.electricity_price)
         def set_electricity_price(price):
-            bst.PowerUtility.price = price
+            tea.electricity_price = price
 
     elif biorefinery == 'cornstover':
         cornstover = feedstock
@@ -947,9 +972,9 @@ def create_IPs_model(biorefinery):
             tea.BT.turbogenerator_efficiency = X / 100.
 
         @param(name='Electricity price', element='TEA', kind='isolated', units='USD/kWh',
-                baseline=bst.PowerUtility.price)
+                baseline=tea.electricity_price)
         def set_electricity_price(price):
-            bst.PowerUtility.price = price
+            tea.electricity_price = price
 
     elif biorefinery == 'sugarcane':
 
@@ -985,314 +1010,447 @@ def create_IPs_model(biorefinery):
             tea.BT.turbogenerator_efficiency = X / 100.
 
         @param(name='Electricity price', element='TEA', kind='isolated', units='USD/kWh',
-                baseline=bst.PowerUtility.price)
+                baseline=tea.electricity_price)
         def set_electricity_price(price):
-            bst.PowerUtility.price = price
+            tea.electricity_price = price
 
     return model
 
 def get_file_name(name):
     return os.path.join(results_folder, name)
 
-def evaluate_args(name, nbox=None):
-    if nbox is None:
-        return {'autoload': True,
-                'autosave': 20,
-                'file': get_file_name(name)}
-    else:
-        nbox[0] += 1
-        return {'autoload': True,
-                'autosave': 20,
-                'file': get_file_name(os.path.join(name, str(nbox[0])))}
+def evaluate_args(name):
+    return {'store': blc.CheckpointStore(get_file_name(name)),
+            'checkpoint': 20}
 
-def evaluate_IP(biorefinery, N=3000):
+# Parallel evaluation ==========================================================
+_worker_arguments = None
+
+def _initialize_worker(create_model, biorefinery):
+    global _worker_arguments
+    _worker_arguments = (create_model, biorefinery)
+
+def _evaluate_chunk(samples):
+    # Each chunk is evaluated by a new model (and TEA) starting from an
+    # emptied system, so results barely depend on which worker evaluates it
+    # or on the chunks it evaluated before
+    create_model, biorefinery = _worker_arguments
+    model = create_model(biorefinery)
+    model._reset_system()
+    model.load_samples(samples)
+    model.evaluate()
+    return model.table[[i.index for i in model.metrics]].values
+
+def evaluate_in_parallel(model, create_model, biorefinery, samples,
+                         processes=None, chunksize=20, notify=False, store=None,
+                         correlation=None):
+    """
+    Evaluate metrics over the given samples with a pool of worker processes
+    and save values to the model table. Each contiguous chunk of samples is
+    evaluated by a new model (and TEA) created in a worker with
+    `create_model(biorefinery)`, starting from an emptied system; results
+    are placed in the table in sample order as they are received.
+
+    Parameters
+    ----------
+    model : Model
+        Model used to load samples and store results.
+    create_model : Callable[str, Model]
+        Module level function that creates the model in each worker (e.g.,
+        `create_states_model` or `create_IPs_model`).
+    biorefinery : str
+        Either 'corn', 'cornstover', or 'sugarcane'.
+    samples : 2d array
+        Parameter samples (as returned by `Model.sample`).
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunksize : int, optional
+        Number of samples per chunk. Defaults to 20.
+    notify : bool, optional
+        Whether to notify the number of evaluated samples and elapsed time
+        (and the strongest correlation estimated so far, if `correlation` is
+        given) after each chunk.
+    store : CheckpointStore, optional
+        Store to append chunk results to as they are received. Samples
+        already in the store are not evaluated again.
+    correlation : SpearmanAccumulator, optional
+        Accumulator of rank correlations updated with stored results and
+        each chunk as it is received.
+
+    Notes
+    -----
+    Chunk boundaries only depend on `chunksize` and each chunk starts from an
+    emptied system, so results agree for any number of processes (and
+    machine) within about 1e-7 relative (internal solver guesses of unit
+    operations are not reset). Within a chunk, each simulation starts from
+    the converged state of the last sample, as in serial evaluations. Thus,
+    results differ from serial evaluations (and across chunk sizes) within
+    the convergence tolerance of the system (a few 1e-3 relative).
+
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    if processes is None: processes = os.cpu_count()
+    model.load_samples(samples)
+    N_samples = len(samples)
+    table = model.table
+    samples = model._samples
+    N_parameters = len(model.parameters)
+    columns = [i.index for i in model.metrics]
+    values = table[columns].values.copy()
+    remaining = np.arange(N_samples)
+    if store is not None:
+        names = [blc.incentives.checkpoints.get_column_name(i) for i in table.columns]
+        index, stored_values = store.load(names)
+        if index.size:
+            if (index >= N_samples).any() or not np.array_equal(stored_values[:, :N_parameters], samples[index]):
+                raise ValueError('samples in checkpoint store do not match loaded samples')
+            values[index] = stored_values[:, N_parameters:]
+            remaining = np.setdiff1d(remaining, index)
+            if correlation is not None: correlation.update(samples[index], values[index])
+    if notify:
+        timer = bst.utils.TicToc()
+        timer.tic()
+    count = N_samples - remaining.size
+    try:
+        with ProcessPoolExecutor(processes, initializer=_initialize_worker,
+                                 initargs=(create_model, biorefinery)) as executor:
+            futures = {}
+            for i in range(0, remaining.size, chunksize):
+                index = remaining[i: i + chunksize]
+                futures[executor.submit(_evaluate_chunk, samples[index])] = index
+            for future in as_completed(futures):
+                chunk = future.result()
+                index = futures[future]
+                values[index] = chunk
+                if store is not None:
+                    store.append(names, index, np.hstack([samples[index], chunk]))
+                if correlation is not None: correlation.update(samples[index], chunk)
+                count += len(chunk)
+                if notify: print(blc.incentives.checkpoints.get_progress_note(count, timer, correlation))
+    finally:
+        table[columns] = values
+    return table
+
+def evaluate_IP(biorefinery, N=3000, processes=None, export_excel=True,
+                notify=0, correlation=None):
+    # Correlations are estimated as samples are evaluated (e.g., to monitor
+    # them with `notify` or by passing an accumulator); exported
+    # correlations are exact
     model = create_IPs_model(biorefinery)
     np.random.seed(1688)
     rule = 'L' # For Latin-Hypercube sampling
     samples = model.sample(N, rule)
-    model.load_samples(samples)
-    model.evaluate(**evaluate_args('IP'))
+    if correlation is None: correlation = blc.SpearmanAccumulator(model.parameters, model.metrics)
+    if processes:
+        evaluate_in_parallel(model, create_IPs_model, biorefinery, samples, processes,
+                             notify=bool(notify), store=evaluate_args('IP')['store'],
+                             correlation=correlation)
+    else:
+        model.load_samples(samples)
+        blc.evaluate_with_checkpoints(model, notify=notify, correlation=correlation,
+                                      **evaluate_args('IP'))
     
     sp_rho_table, sp_p_table = model.spearman_r()
-    model.table.to_excel(get_file_name('IP.xlsx'))
-    sp_rho_table.to_excel(get_file_name('correlation.xlsx'))
+    if export_excel:
+        model.table.to_excel(get_file_name('IP.xlsx'))
+        sp_rho_table.to_excel(get_file_name('correlation.xlsx'))
     return model.table
 
-#Evaluate across property tax
-def evaluate_propT(biorefinery, N=1000):
-    model = create_IPs_model(biorefinery)
-    if biorefinery == 'corn':
-        tea = blc.create_corn_tea()
-        tea.feedstock.price = 0.1500
-
-    elif biorefinery == 'cornstover':
-        tea = blc.create_cornstover_tea()
-        tea.feedstock.price = 0.0994
-
-    elif biorefinery == 'sugarcane':
-        tea = blc.create_sugarcane_tea()
-        tea.feedstock.price = 0.0332
-
-    parameters = list(model.get_parameters())
+# Coordinate sweeps ============================================================
+#: Default sweeps by name. Coordinates that are not parameters of the model
+#: are set as TEA scenario attributes (see `CellulosicIncentivesTEA._set_scenario`)
+#: over the given bounds.
+sweeps = {
+    'propT': dict(coordinate='State property tax rate', scenario='property_tax',
+                  bounds=(0., 0.04), points=8, label='[TEA] State property tax rate (%)',
+                  xlfile='Eval_across_st_prop_tax.xlsx'),
+    'incT': dict(coordinate='State income tax rate', scenario='state_income_tax',
+                 bounds=(0., 0.12), points=24, label='[TEA] State income tax rate (%)',
+                 xlfile='Eval_across_st_inc_tax.xlsx'),
+    'fuelT': dict(coordinate='Fuel tax rate', scenario='fuel_tax',
+                  bounds=(0., 0.05), points=10, label='[TEA] Fuel tax rate (%)',
+                  xlfile='Eval_across_fuel_tax.xlsx'),
+    'saleT': dict(coordinate='Sales tax rate', scenario='sales_tax',
+                  bounds=(0., 0.0725), points=14, label='[TEA] State sales tax rate (%)',
+                  xlfile='Eval_across_st_sales_tax.xlsx'),
+    'LCCF': dict(coordinate='LCCF', scenario='F_investment',
+                 bounds=(0.8, 1.2), points=8, label='[TEA] LCCF (unitless)',
+                 xlfile='Eval_across_LCCF.xlsx'),
+    'elecP': dict(coordinate='Electricity price', scenario='electricity_price',
+                  bounds=(0.0459, 0.1072), points=10, label='[Power utility] Electricity price (USD/kWh)',
+                  xlfile='Eval_across_elec_price.xlsx'),
+}
+
+def get_sweep_coordinate(model, coordinate, scenario=None):
+    """
+    Remove the coordinate from the sampled parameters of the model and return
+    a function that sets the coordinate and the bounds of its distribution
+    (or None if the coordinate is not a parameter).
+
+    Parameters
+    ----------
+    model : IncentivesModel
+        Model to sweep.
+    coordinate : str
+        Name of any parameter of the model.
+    scenario : str, optional
+        TEA scenario attribute (e.g., 'property_tax' or 'electricity_price')
+        to set if the model has no parameter with the coordinate name.
+
+    """
+    parameters = list(model.parameters)
     for parameter in parameters:
-        if parameter.name == 'State property tax rate':
-            set_state_property_tax = parameter
-            parameters.remove(parameter)
-            break
-    model_ = bst.Model(tea.system,
-                       metrics=model.metrics,
-                       parameters=parameters,
-                       exception_hook='raise')
-    np.random.seed(1688)
-    rule = 'L' # For Latin-Hypercube sampling
-    samples = model_.sample(N, rule)
-    model_.load_samples(samples)
-    nbox = [0]
-    def f_evaluate(notify=True):
-        model_.evaluate(**evaluate_args('propT', nbox), notify=20)
-    return model_.evaluate_across_coordinate(
-                                            '[TEA] State property tax rate (%)',
-                                            set_state_property_tax,
-                                            np.linspace(
-                                            set_state_property_tax.distribution.lower.min(),
-                                            set_state_property_tax.distribution.upper.max(),
-                                            8,),
-                                            xlfile=get_file_name('Eval_across_st_prop_tax.xlsx'),
-                                            notify=True,
-                                            f_evaluate=f_evaluate,
-                                            )
-
-#Evaluate across state income tax
-def evaluate_incT(biorefinery, N=1000):
+        if parameter.name == coordinate: break
+    else:
+        if scenario is None: raise ValueError(f"no parameter named '{coordinate}'")
+        tea = model.system.TEA
+        def f_coordinate(value):
+            tea._set_scenario({scenario: value})
+        return f_coordinate, None
+    parameters.remove(parameter)
+    model.parameters = parameters
+    distribution = parameter.distribution
+    bounds = (distribution.lower.min(), distribution.upper.max())
+    scale = parameter.scale
+    setter = parameter.setter
+    if parameter.kind in blc.ECONOMIC_KINDS:
+        def f_coordinate(value):
+            setter(value if scale is None else scale * value)
+    else:
+        def f_coordinate(value):
+            setter(value if scale is None else scale * value)
+            model.invalidate_simulation()
+    return f_coordinate, bounds
+
+def create_sweep_model(biorefinery, coordinate, scenario=None, N=1000, samples=None):
+    """
+    Return a model of the biorefinery with samples of all parameters except
+    the coordinate loaded, a function that sets the coordinate, and the bounds
+    of the coordinate (or None if the coordinate is not a parameter).
+
+    Parameters
+    ----------
+    biorefinery : str
+        Either 'corn', 'cornstover', or 'sugarcane'.
+    coordinate : str
+        Name of any parameter of the model.
+    scenario : str, optional
+        TEA scenario attribute to set if the model has no parameter with the
+        coordinate name.
+    N : int, optional
+        Number of samples. Defaults to 1000.
+    samples : 2d array, optional
+        Samples to load instead of sampling.
+
+    """
     model = create_IPs_model(biorefinery)
-    if biorefinery == 'corn':
-        tea = blc.create_corn_tea()
-        tea.feedstock.price = 0.1500
+    f_coordinate, bounds = get_sweep_coordinate(model, coordinate, scenario)
+    if samples is None:
+        np.random.seed(1688)
+        rule = 'L' # For Latin-Hypercube sampling
+        samples = model.sample(N, rule)
+    model.load_samples(samples)
+    return model, f_coordinate, bounds
 
-    elif biorefinery == 'cornstover':
-        tea = blc.create_cornstover_tea()
-        tea.feedstock.price = 0.0994
+def _evaluate_sweep_point(model, f_coordinate, value, folder):
+    f_coordinate(value)
+    if folder is None:
+        model.evaluate()
+    else:
+        blc.evaluate_with_checkpoints(model, blc.CheckpointStore(folder))
+    return model.table[[i.index for i in model.metrics]].values
+
+_worker_sweep = None
+
+def _initialize_sweep_worker(biorefinery, coordinate, scenario, samples):
+    global _worker_sweep
+    model, f_coordinate, bounds = create_sweep_model(
+        biorefinery, coordinate, scenario, samples=samples
+    )
+    _worker_sweep = (model, f_coordinate)
+
+def _evaluate_sweep_point_in_worker(value, folder):
+    model, f_coordinate = _worker_sweep
+    return _evaluate_sweep_point(model, f_coordinate, value, folder)
+
+def sweep_coordinate(biorefinery, coordinate, values=None, points=10, N=1000,
+                     scenario=None, bounds=None, label=None, xlfile=None,
+                     checkpoints=None, processes=None, notify=True):
+    """
+    Evaluate all metrics of the incentives model across coordinate values
+    and return metric values by metric index as 2d arrays (samples x
+    coordinate values). The model is created once and the same samples (of
+    all other parameters) are evaluated at each coordinate value.
+
+    Parameters
+    ----------
+    biorefinery : str
+        Either 'corn', 'cornstover', or 'sugarcane'.
+    coordinate : str
+        Name of any parameter of the model.
+    values : 1d array, optional
+        Coordinate values. Defaults to evenly spaced points over the bounds
+        of the coordinate.
+    points : int, optional
+        Number of coordinate values if not given. Defaults to 10.
+    N : int, optional
+        Number of samples. Defaults to 1000.
+    scenario : str, optional
+        TEA scenario attribute to set if the model has no parameter with the
+        coordinate name.
+    bounds : tuple[float, float], optional
+        Bounds of the coordinate if it is not a parameter of the model.
+    label : str, optional
+        Name of coordinate in the Excel file. Defaults to the coordinate.
+    xlfile : str, optional
+        Name of Excel file to save.
+    checkpoints : str, optional
+        Folder to save checkpoint stores of each coordinate value. Defaults
+        to no checkpoints.
+    processes : int, optional
+        Number of worker processes that evaluate coordinate values in
+        parallel. Defaults to evaluating in this process.
+    notify : bool, optional
+        Whether to notify the elapsed time after each coordinate value.
+
+    """
+    model, f_coordinate, parameter_bounds = create_sweep_model(
+        biorefinery, coordinate, scenario, N
+    )
+    if values is None:
+        if parameter_bounds is not None: bounds = parameter_bounds
+        if bounds is None: raise ValueError("missing parameter 'bounds'")
+        values = np.linspace(*bounds, points)
+    N_points = len(values)
+    folders = [
+        None if checkpoints is None else os.path.join(checkpoints, str(n))
+        for n in range(1, N_points + 1)
+    ]
+    metrics = model.metrics
+    metric_data = {i.index: np.zeros([N, N_points]) for i in metrics}
+    def save_point(n, point_data):
+        for metric, data in zip(metrics, point_data.transpose()):
+            metric_data[metric.index][:, n] = data
+        if notify: print(f"[Coordinate {n}] Elapsed time: {timer.elapsed_time:.0f} sec")
+    if notify:
+        timer = bst.utils.TicToc()
+        timer.tic()
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        initargs = (biorefinery, coordinate, scenario, model._samples)
+        with ProcessPoolExecutor(processes, initializer=_initialize_sweep_worker,
+                                 initargs=initargs) as executor:
+            futures = {
+                executor.submit(_evaluate_sweep_point_in_worker, value, folder): n
+                for n, (value, folder) in enumerate(zip(values, folders))
+            }
+            for future in as_completed(futures):
+                save_point(futures[future], future.result())
+    else:
+        for n, (value, folder) in enumerate(zip(values, folders)):
+            save_point(n, _evaluate_sweep_point(model, f_coordinate, value, folder))
+    if xlfile:
+        data = pd.DataFrame(data=np.zeros([N, N_points]),
+                            columns=pd.Index(values, name=label or coordinate))
+        with pd.ExcelWriter(xlfile) as writer:
+            for metric in metrics:
+                data[:] = metric_data[metric.index]
+                data.to_excel(writer, sheet_name=metric.short_description)
+    return metric_data
+
+def evaluate_sweep(biorefinery, name, N=1000, processes=None):
+    """
+    Evaluate a default sweep (see `sweeps`) with checkpoints and save results
+    to an Excel file in the results folder.
+
+    """
+    sweep = sweeps[name].copy()
+    sweep['xlfile'] = get_file_name(sweep['xlfile'])
+    return sweep_coordinate(biorefinery, N=N, checkpoints=get_file_name(name),
+                            processes=processes, **sweep)
+
+def trace_sweep(biorefinery, name, values=None, N=1000, incentive_numbers=()):
+    """
+    Return the MFSP [USD/gal] and its derivative with respect to the
+    coordinate of a default sweep (see `sweeps`) as DataFrame objects
+    (samples x coordinate values) and the breakpoints of each sample (list[1d
+    array]). Instead of evaluating the model at each coordinate value, each
+    sample is simulated once and the MFSP is traced across coordinate values
+    (see `CellulosicIncentivesTEA.solve_price_sweep`).
+
+    Parameters
+    ----------
+    biorefinery : str
+        Either 'corn', 'cornstover', or 'sugarcane'.
+    name : str
+        Name of sweep (e.g., 'incT', 'propT').
+    values : 1d array, optional
+        Coordinate values. Defaults to evenly spaced points over the bounds
+        of the coordinate.
+    N : int, optional
+        Number of samples. Defaults to 1000.
+    incentive_numbers : Iterable[int], optional
+        Incentives of the biorefinery. Defaults to no incentives.
+
+    """
+    sweep = sweeps[name]
+    coordinate = sweep['coordinate']
+    scenario = sweep['scenario']
+    model, f_coordinate, bounds = create_sweep_model(biorefinery, coordinate, scenario, N)
+    if values is None:
+        values = np.linspace(*(bounds or sweep['bounds']), sweep['points'])
+    tea = model.system.TEA
+    stream = tea.ethanol_product
+    MFSPs = np.zeros([N, len(values)])
+    derivatives = MFSPs.copy()
+    breakpoints = []
+    with tea.scenario(dict(incentive_numbers=tuple(incentive_numbers))):
+        for i, sample in enumerate(model._samples):
+            model._update_state(sample)
+            MFSPs[i], derivatives[i], sample_breakpoints = tea.solve_price_sweep(stream, scenario, values)
+            breakpoints.append(sample_breakpoints)
+    columns = pd.Index(values, name=sweep['label'])
+    return (
+        pd.DataFrame(2.98668849 * MFSPs, columns=columns),
+        pd.DataFrame(2.98668849 * derivatives, columns=columns),
+        breakpoints,
+    )
 
-    elif biorefinery == 'sugarcane':
-        tea = blc.create_sugarcane_tea()
-        tea.feedstock.price = 0.0332
+#Evaluate across property tax
+def evaluate_propT(biorefinery, N=1000, processes=None):
+    return evaluate_sweep(biorefinery, 'propT', N, processes)
 
-    parameters = list(model.get_parameters())
-    for parameter in parameters:
-        if parameter.name == 'State income tax rate':
-            set_state_income_tax = parameter
-            parameters.remove(parameter)
-            break
-    model_ = bst.Model(tea.system,
-                       metrics=model.metrics,
-                       parameters=parameters,
-                       exception_hook='raise')
-    np.random.seed(1688)
-    rule = 'L' # For Latin-Hypercube sampling
-    samples = model_.sample(N, rule)
-    model_.load_samples(samples)
-    nbox = [0]
-    def f_evaluate(notify=True):
-        model_.evaluate(**evaluate_args('incT', nbox), notify=20)
-    return model_.evaluate_across_coordinate(
-                                            '[TEA] State income tax rate (%)',
-                                            set_state_income_tax,
-                                            np.linspace(
-                                            set_state_income_tax.distribution.lower.min(),
-                                            set_state_income_tax.distribution.upper.max(),
-                                            24,),
-                                            xlfile=get_file_name('Eval_across_st_inc_tax.xlsx'),
-                                            notify=True,
-                                            f_evaluate=f_evaluate,
-                                            )
+#Evaluate across state income tax
+def evaluate_incT(biorefinery, N=1000, processes=None):
+    return evaluate_sweep(biorefinery, 'incT', N, processes)
 
 #Evaluate across fuel tax
-def evaluate_fuelT(biorefinery, N=1000):
-    model = create_IPs_model(biorefinery)
-    if biorefinery == 'corn':
-        tea = blc.create_corn_tea()
-        tea.feedstock.price = 0.1500
-
-    elif biorefinery == 'cornstover':
-        tea = blc.create_cornstover_tea()
-        tea.feedstock.price = 0.0994
-
-    elif biorefinery == 'sugarcane':
-        tea = blc.create_sugarcane_tea()
-        tea.feedstock.price = 0.0332
-
-    parameters = list(model.get_parameters())
-    for parameter in parameters:
-        if parameter.name == 'Fuel tax rate':
-            set_motor_fuel_tax = parameter
-            parameters.remove(parameter)
-            break
-    model_ = bst.Model(tea.system,
-                       metrics=model.metrics,
-                       parameters=parameters,
-                       exception_hook='raise')
-    np.random.seed(1688)
-    rule = 'L' # For Latin-Hypercube sampling
-    samples = model_.sample(N, rule)
-    model_.load_samples(samples)
-    nbox = [0]
-    def f_evaluate(notify=True):
-        model_.evaluate(**evaluate_args('fuelT', nbox), notify=20)
-    return model_.evaluate_across_coordinate(
-                                            '[TEA] Fuel tax rate (%)',
-                                            set_motor_fuel_tax,
-                                            np.linspace(
-                                            set_motor_fuel_tax.distribution.lower.min(),
-                                            set_motor_fuel_tax.distribution.upper.max(),
-                                            10,),
-                                            xlfile=get_file_name('Eval_across_fuel_tax.xlsx'),
-                                            notify=True,
-                                            f_evaluate=f_evaluate,
-                                            )
+def evaluate_fuelT(biorefinery, N=1000, processes=None):
+    return evaluate_sweep(biorefinery, 'fuelT', N, processes)
 
 #Evaluate across sales tax
-def evaluate_saleT(biorefinery, N=1000):
-    model = create_IPs_model(biorefinery)
-    if biorefinery == 'corn':
-        tea = blc.create_corn_tea()
-        tea.feedstock.price = 0.1500
-
-    elif biorefinery == 'cornstover':
-        tea = blc.create_cornstover_tea()
-        tea.feedstock.price = 0.0994
-
-    elif biorefinery == 'sugarcane':
-        tea = blc.create_sugarcane_tea()
-        tea.feedstock.price = 0.0332
-
-    parameters = list(model.get_parameters())
-    for parameter in parameters:
-        if parameter.name == 'Sales tax rate':
-            set_sales_tax = parameter
-            parameters.remove(parameter)
-            break
-    model_ = bst.Model(tea.system,
-                       metrics=model.metrics,
-                       parameters=parameters,
-                       exception_hook='raise')
-    np.random.seed(1688)
-    rule = 'L' # For Latin-Hypercube sampling
-    samples = model_.sample(N, rule)
-    model_.load_samples(samples)
-    nbox = [0]
-    def f_evaluate(notify=True):
-        model_.evaluate(**evaluate_args('saleT', nbox), notify=20)
-    return model_.evaluate_across_coordinate(
-                                            '[TEA] State sales tax rate (%)',
-                                            set_sales_tax,
-                                            np.linspace(
-                                            set_sales_tax.distribution.lower.min(),
-                                            set_sales_tax.distribution.upper.max(),
-                                            14,),
-                                            xlfile=get_file_name('Eval_across_st_sales_tax.xlsx'),
-                                            notify=True,
-                                            f_evaluate=f_evaluate,
-                                            )
+def evaluate_saleT(biorefinery, N=1000, processes=None):
+    return evaluate_sweep(biorefinery, 'saleT', N, processes)
 
 #Evaluate across LCCF
-def evaluate_LCCF(biorefinery, N=1000):
-    model = create_IPs_model(biorefinery)
-    if biorefinery == 'corn':
-        tea = blc.create_corn_tea()
-        tea.feedstock.price = 0.1500
-
-    elif biorefinery == 'cornstover':
-        tea = blc.create_cornstover_tea()
-        tea.feedstock.price = 0.0994
-
-    elif biorefinery == 'sugarcane':
-        tea = blc.create_sugarcane_tea()
-        tea.feedstock.price = 0.0332
-
-    parameters = list(model.get_parameters())
-    set_LCCF = None
-    for parameter in parameters:
-        if parameter.name == 'LCCF':
-            set_LCCF = parameter
-            parameters.remove(parameter)
-            break
-    if set_LCCF is None:
-        def set_LCCF(LCCF): tea.F_investment = LCCF
-    model_ = bst.Model(tea.system,
-                       metrics=model.metrics,
-                       parameters=parameters,
-                       exception_hook='raise')
-    np.random.seed(1688)
-    rule = 'L' # For Latin-Hypercube sampling
-    samples = model_.sample(N, rule)
-    model_.load_samples(samples)
-    nbox = [0]
-    def f_evaluate(notify=True):
-        model_.evaluate(**evaluate_args('LCCF', nbox), notify=20)
-    return model_.evaluate_across_coordinate(
-                                            '[TEA] LCCF (unitless)',
-                                            set_LCCF,
-                                            np.linspace(
-                                            set_LCCF.distribution.lower.min(),
-                                            set_LCCF.distribution.upper.max(),
-                                            8,),
-                                            xlfile=get_file_name('Eval_across_LCCF.xlsx'),
-                                            notify=True,
-                                            f_evaluate=f_evaluate,
-                                            )
+def evaluate_LCCF(biorefinery, N=1000, processes=None):
+    return evaluate_sweep(biorefinery, 'LCCF', N, processes)
 
 #Evaluate across electricity price
-def evaluate_elecP(biorefinery, N=1000):
-    model = create_IPs_model(biorefinery)
-    if biorefinery == 'corn':
-        tea = blc.create_corn_tea()
-        tea.feedstock.price = 0.1500
-
-    elif biorefinery == 'cornstover':
-        tea = blc.create_cornstover_tea()
-        tea.feedstock.price = 0.0994
-
-    elif biorefinery == 'sugarcane':
-        tea = blc.create_sugarcane_tea()
-        tea.feedstock.price = 0.0332
-
-    parameters = list(model.get_parameters())
-    for parameter in parameters:
-        if parameter.name == 'Electricity price':
-            set_elec_price = parameter
-            parameters.remove(parameter)
-            break
-    model_ = bst.Model(tea.system,
-                       metrics=model.metrics,
-                       parameters=parameters,
-                       exception_hook='raise')
-    np.random.seed(1688)
-    rule = 'L' # For Latin-Hypercube sampling
-    samples = model_.sample(N, rule)
-    model_.load_samples(samples)
-    nbox = [0]
-    def f_evaluate(notify=True):
-        model_.evaluate(**evaluate_args('elecP', nbox), notify=20)
-    return model_.evaluate_across_coordinate(
-                                            '[Power utility] Electricity price (USD/kWh)',
-                                            set_elec_price,
-                                            np.linspace(
-                                            set_elec_price.distribution.lower.min(),
-                                            set_elec_price.distribution.upper.max(),
-                                            10,),
-                                            xlfile=get_file_name('Eval_across_elec_price.xlsx'),
-                                            notify=True,
-                                            f_evaluate=f_evaluate,
-                                            )
+def evaluate_elecP(biorefinery, N=1000, processes=None):
+    return evaluate_sweep(biorefinery, 'elecP', N, processes)
 
 # Get Spearman's correlation coefficients
-def evaluate_correlation(biorefinery,N=10000):
+def evaluate_correlation(biorefinery,N=10000, notify=0, correlation=None):
+    # See `evaluate_IP` for estimated and exported correlations
     model = create_IPs_model(biorefinery)
     np.random.seed(1688)
     rule = 'L' # For Latin-Hypercube sampling
     samples = model.sample(N, rule)
     model.load_samples(samples)
-    model.evaluate(**evaluate_args('correlation'))
+    if correlation is None: correlation = blc.SpearmanAccumulator(model.parameters, model.metrics)
+    blc.evaluate_with_checkpoints(model, notify=notify, correlation=correlation,
+                                  **evaluate_args('correlation'))
     sp_rho_table, sp_p_table = model.spearman_r()
     sp_rho_table.to_excel(get_file_name('correlation.xlsx'))
     return sp_rho_table
@@ -3,16 +3,13 @@ Created on Sun Oct  4 12:18:15 2020
 
 @author: yrc2. Modified by Dalton Stewart.
 """
-import os
-import pandas as pd
 import numpy as np
 from biorefineries import corn as cn
 from biorefineries import sugarcane as sc
 from biorefineries import cornstover as cs
 import blocs as blc
 import biosteam as bst
-cs._include_blowdown_recycle = False
-cs.load()
+import flexsolve as flx
 
 __all__ = (
     'create_corn_tea',
@@ -21,6 +18,8 @@ __all__ = (
     'create_incentivized_tea',
     'ConventionalIncentivesTEA',
     'CellulosicIncentivesTEA',
+    'ScenarioOverlay',
+    'CashFlowWorkspace',
 )
 
 def create_corn_tea():
@@ -87,7 +86,14 @@ def create_sugarcane_tea():
     tea.makeup_water.price = 0.0005
     return tea
 
+def load_cornstover():
+    # The cornstover biorefinery is only loaded (and simulated) once, on first use
+    if not cs._biorefinery_loaded:
+        cs._include_blowdown_recycle = False
+        cs.load()
+
 def create_cornstover_tea():    
+    load_cornstover()
     tea = cs.create_tea(cs.cornstover_sys, cls=CellulosicIncentivesTEA)
     tea.incentive_numbers = () # Empty for now
     tea.fuel_tax = 0.
@@ -144,25 +150,111 @@ def create_incentivized_tea(
         tea.ethanol_group = bst.UnitGroup('Ethanol group', system.units)
     else:
         tea.ethanol_group = bst.UnitGroup('Ethanol group', ())
-    folder = os.path.dirname(__file__)
-    st_data_file = os.path.join(folder, 'state_scenarios_for_import.xlsx')
-    st_data = pd.read_excel(st_data_file, index_col=[0])
     if state:
-        tea.state_income_tax = st_data.loc[state]['Income Tax Rate (decimal)']
-        tea.property_tax = st_data.loc[state]['Property Tax Rate (decimal)']
-        tea.fuel_tax = st_data.loc[state]['State Motor Fuel Tax (decimal)']
-        tea.sales_tax = st_data.loc[state]['State Sales Tax Rate (decimal)']
-        bst.PowerUtility.price = st_data.loc[state]['Electricity Price (USD/kWh)']
-        tea.F_investment = st_data.loc[state]['Location Capital Cost Factor (dimensionless)']
-        if feedstock.ID == 'corn':
-            name = 'CN'
-        elif feedstock.ID == 'sugarcane':
-            name = 'SC'
-        elif feedstock.ID == 'cornstover':
-            name = 'CS'
-        tea.feedstock.price = st_data.loc[state][f'{name} Price (USD/kg)']
+        scenario = blc.load_state_table().scenario(state, feedstock.ID)
+        tea._set_scenario(scenario)
     return tea
 
+class ScenarioOverlay:
+    """
+    Create a ScenarioOverlay object that sets attributes of objects (e.g., a
+    TEA and its feedstock) when entered as a context manager and restores
+    their original values on exit. Targets and values are resolved once, so
+    the overlay can be applied repeatedly at little cost. Overlays are not
+    reentrant.
+
+    Parameters
+    ----------
+    targets : Iterable[tuple[object, str]]
+        Objects and attribute names.
+    values : Iterable
+        Attribute values.
+
+    """
+    __slots__ = ('targets', 'values', 'original')
+
+    def __init__(self, targets, values):
+        self.targets = tuple(targets)
+        self.values = tuple(values)
+        if len(self.targets) != len(self.values):
+            raise ValueError('number of targets and values must be equal')
+        self.original = None
+
+    def __enter__(self):
+        if self.original is not None: raise RuntimeError('scenario overlay is already applied')
+        targets = self.targets
+        self.original = [getattr(obj, name) for obj, name in targets]
+        for (obj, name), value in zip(targets, self.values): setattr(obj, name, value)
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        for (obj, name), value in zip(self.targets, self.original): setattr(obj, name, value)
+        self.original = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join([f'{name}={value!r}' for (obj, name), value in zip(self.targets, self.values)])})"
+
+
+class CashFlowWorkspace:
+    """
+    Create a CashFlowWorkspace object with preallocated year-length buffers
+    that cash flow evaluations write into in place. Buffers are overwritten
+    by every evaluation, so no arrays are allocated while solving the price.
+
+    Parameters
+    ----------
+    plant_years : int
+        Number of years of the cash flow analysis.
+
+    """
+    __slots__ = (
+        'plant_years',
+        'owner', # [TEA] Only the owner may use the buffers (i.e., not copies of the TEA).
+        'buffers', # [2d array] All buffers (rows).
+        'taxable_cashflow', 'tax', 'incentives', 'cashflow',
+        'fed_income_tax_assessed', 'state_income_tax_assessed',
+        'incentive_values', # [2d array] Exemptions, deductions, credits, refunds, and buffers of the incentive plan.
+        'exemptions', 'deductions', 'credits', 'refunds',
+        'index', # [1d array] Years with taxable earnings.
+    )
+    names = (
+        'taxable_cashflow', 'tax', 'incentives', 'cashflow',
+        'fed_income_tax_assessed', 'state_income_tax_assessed',
+        'exemptions', 'deductions', 'credits', 'refunds',
+    )
+
+    def __init__(self, plant_years, owner=None):
+        self.plant_years = plant_years
+        self.owner = owner
+        names = self.names
+        self.buffers = buffers = np.zeros([len(names) + 2, plant_years])
+        for name, buffer in zip(names, buffers): setattr(self, name, buffer)
+        self.incentive_values = buffers[6:]
+        self.index = np.zeros(plant_years, bool)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.plant_years} years>"
+
+
+def incentive_values_property(index, name):
+    # Incentives of the last cash flow evaluation may be held in the buffers
+    # of the workspace (i.e., overwritten by the next evaluation), so read-only
+    # copies are returned; in-place edits raise instead of being lost
+    def fget(self):
+        value = self._incentive_values[index]
+        if value is None: return None
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+
+    def fset(self, value):
+        values = list(self._incentive_values)
+        values[index] = value
+        self._incentive_values = tuple(values)
+
+    return property(fget, fset, doc=f"Tax {name} [USD/yr] of the last cash flow evaluation (read-only 1d array; assign a new array to replace it).")
+
+
 class CellulosicIncentivesTEA(cs.CellulosicEthanolTEA):
 
     def __init__(self, *args, incentive_numbers=(),
@@ -179,6 +271,7 @@ class CellulosicIncentivesTEA(cs.CellulosicEthanolTEA):
                  BT=None,
                  feedstock=None,
                  F_investment=1.,
+                 electricity_price=None,
                  **kwargs):
         super().__init__(*args, **kwargs)
         self.property_tax = property_tax
@@ -194,6 +287,7 @@ class CellulosicIncentivesTEA(cs.CellulosicEthanolTEA):
         self.feedstock = feedstock
         self.utility_tax = utility_tax
         self.F_investment = F_investment
+        self.electricity_price = electricity_price
         self.BT = BT
         self.jobs_50 = 50
         self.deduct_federal_income_tax_to_state_taxable_earnings = False
@@ -210,52 +304,54 @@ class CellulosicIncentivesTEA(cs.CellulosicEthanolTEA):
         else:
             self._depreciation_array = self.depreciation_schedules[self.depreciation]
 
+    @property
+    def utility_cost(self):
+        """
+        Total utility cost [USD/yr]. If the TEA has an `electricity_price`
+        [USD/kWh], electricity is valued at this price instead of the global
+        `PowerUtility.price` (which should not change between simulating the
+        system and evaluating the TEA). Thus, TEAs sharing a simulated system
+        can be evaluated at different electricity prices (e.g., concurrently)
+        without re-simulating.
+        """
+        system = self.system
+        electricity_price = self.electricity_price
+        if electricity_price is None: return system.utility_cost
+        power_utilities = [i.power_utility for i in system.cost_units]
+        return system.utility_cost + system.operating_hours * (
+            electricity_price * sum([i.rate for i in power_utilities])
+            - sum([i.cost for i in power_utilities])
+        )
+
     def _FCI(self, TDC):
         self._FCI_cached = FCI = self.F_investment * super()._FCI(TDC)
         return FCI
 
-    def _fill_tax_and_incentives(self, incentives, taxable_cashflow, nontaxable_cashflow, tax, depreciation):
-        taxable_cashflow[taxable_cashflow < 0.] = 0.
+    #: Quantities in the tax and incentive calculations that do not depend
+    #: on the taxable cash flow (see `_get_tax_invariants`).
+    _tax_invariants = None
+
+    def _get_tax_invariants(self, depreciation):
+        # All quantities that remain constant while solving the price/IRR are
+        # computed once per cash flow analysis. Each analysis (e.g., after
+        # re-simulating the system or changing TEA attributes) creates a new
+        # depreciation array, which is used to invalidate the cache.
+        invariants = self._tax_invariants
+        if invariants is not None and invariants['depreciation'] is depreciation:
+            return invariants
+        plan = blc.get_incentive_plan(self.incentive_numbers)
         lang_factor = self.lang_factor
-        if lang_factor:
-            converyor_costs = lang_factor * sum([i.purchase_cost for i in self.units if isinstance(i, bst.ConveyingBelt)])
-        else:
-            converyor_costs = sum([i.installed_cost for i in self.units if isinstance(i, bst.ConveyingBelt)])
         operating_hours = self.operating_hours
         ethanol_product = self.ethanol_product
         biodiesel_product = self.biodiesel_product
-        biodiesel_group = self.biodiesel_group
-        ethanol_group = self.ethanol_group
-        BT = self.BT
         fuel_value = 0.
-        if ethanol_product:
-            # Ethanol in gal/yr
-            ethanol = 2.98668849 * ethanol_product.F_mass * operating_hours
-            fuel_value += ethanol_product.cost * operating_hours
-            ethanol_eq = 1e6 * ethanol_group.get_installed_cost()
-        else:
-            ethanol = ethanol_eq = ethanol_sales = 0.
-        if biodiesel_product:
-            fuel_value += biodiesel_product.cost * operating_hours
-            if lang_factor:
-                biodiesel_eq = 1e6 * lang_factor * biodiesel_group.get_purchase_cost()
-            else:
-                biodiesel_eq = 1e6 * biodiesel_group.get_installed_cost()
-        else:
-            biodiesel_eq = 0.
-        feedstock = self.feedstock
-        feedstock_value = feedstock.cost * operating_hours
-        if lang_factor:
-            elec_eq = lang_factor * BT.purchase_cost if BT else 0.
-        else:
-            elec_eq = BT.installed_cost if BT else 0.
-        TCI = self.TCI
-        wages = self.labor_cost
+        if ethanol_product: fuel_value += ethanol_product.cost * operating_hours
+        if biodiesel_product: fuel_value += biodiesel_product.cost * operating_hours
+        feedstock_value = self.feedstock.cost * operating_hours
         FCI = self.FCI
         startup_VOCfrac = self.startup_VOCfrac
         startup_FOCfrac = self.startup_FOCfrac
         construction_schedule = self._construction_schedule
-        taxable_property = FCI
         start = self._start
         years = self._years
         w0 = self._startup_time
@@ -274,79 +370,559 @@ class CellulosicIncentivesTEA(cs.CellulosicEthanolTEA):
             y[:start] = x * construction_schedule
             return y
 
-        wages_arr = yearly_flows(wages, startup_FOCfrac)
         fuel_value_arr = yearly_flows(fuel_value, startup_VOCfrac)
         feedstock_value_arr = yearly_flows(feedstock_value, startup_VOCfrac)
-        ethanol_arr = yearly_flows(ethanol, startup_VOCfrac)
-        taxable_property_arr = (construction_flow(taxable_property) - depreciation).cumsum()
-        elec_eq_arr = construction_flow(elec_eq).cumsum()
-        biodiesel_eq_arr = construction_flow(biodiesel_eq).cumsum()
-        ethanol_eq_arr = construction_flow(ethanol_eq).cumsum()
-        converyor_cost_arr = construction_flow(converyor_costs).cumsum()
+        taxable_property_arr = (construction_flow(FCI) - depreciation).cumsum()
         property_tax_arr = taxable_property_arr * self.property_tax
         fuel_tax_arr = self.fuel_tax * fuel_value_arr
         sales_tax = self.sales_tax
         purchase_cost_arr = construction_flow(self.purchase_cost)
         sales_arr = purchase_cost_arr + feedstock_value_arr
         sales_tax_arr = None if sales_tax is None else sales_arr * sales_tax
-        util_cost_arr = yearly_flows(abs(self.utility_cost), startup_FOCfrac) # absolute value of utility cost bc it will likely always be negative
-        util_tax_arr = self.utility_tax * util_cost_arr
-        federal_assessed_income_tax = taxable_cashflow * self.federal_income_tax
-        if self.deduct_federal_income_tax_to_state_taxable_earnings:
-            state_assessed_income_tax = (taxable_cashflow - federal_assessed_income_tax) * self.state_income_tax
-        else:
-            state_assessed_income_tax = taxable_cashflow * self.state_income_tax
-        if self.deduct_half_federal_income_tax_to_state_taxable_earnings:
-            state_assessed_income_tax = (taxable_cashflow - (0.5*federal_assessed_income_tax)) * self.state_income_tax
-        else:
-            state_assessed_income_tax = taxable_cashflow * self.state_income_tax
         if self.state_tax_by_gross_receipts:
             revenue_arr = yearly_flows(self.sales, startup_VOCfrac)
-            state_assessed_income_tax = revenue_arr * self.state_income_tax
+            gross_receipts_tax = revenue_arr * self.state_income_tax
+            dependent_parameters = ('fed_income_tax_assessed',)
         else:
-            state_assessed_income_tax = taxable_cashflow * self.state_income_tax
-        exemptions, deductions, credits, refunds = blc.determine_tax_incentives(
-            self.incentive_numbers,
-            start=self._start,
-            plant_years=self._years + self._start,
-            value_added=FCI,
-            property_taxable_value=taxable_property_arr,
-            property_tax_rate=self.property_tax,
-            biodiesel_eq=biodiesel_eq_arr,
-            ethanol_eq=ethanol_eq_arr,
-            fuel_taxable_value=fuel_value_arr,
-            fuel_tax_rate=self.fuel_tax,
-            sales_taxable_value=sales_arr, # Regards equipment cost with building materials (foundation, pipping, etc.), installation fees, and biomass flow rate
-            sales_tax_rate=self.sales_tax,
-            sales_tax_assessed=sales_tax_arr,
-            wages=wages_arr,
-            TCI=TCI,
-            ethanol=ethanol_arr,
-            fed_income_tax_assessed=federal_assessed_income_tax,
-            elec_eq=elec_eq_arr,
-            jobs_50=self.jobs_50, # Assumption made by the original lipid-cane biorefinery publication
-            utility_tax_assessed=util_tax_arr,
-            state_income_tax_assessed=state_assessed_income_tax,
-            property_tax_assessed=property_tax_arr,
-            IA_value=converyor_cost_arr,
-            building_mats=purchase_cost_arr,
-            NM_value=elec_eq + feedstock_value_arr,
+            gross_receipts_tax = None
+            dependent_parameters = ('fed_income_tax_assessed', 'state_income_tax_assessed')
+        self._tax_invariants = invariants = {
+            'depreciation': depreciation,
+            'tax': property_tax_arr + fuel_tax_arr + sales_tax_arr, # util_tax_arr; utility tax not currently considered
+            'gross_receipts_tax': gross_receipts_tax,
+        }
+        if not plan.incentive_numbers:
+            invariants['incentives'] = (empty_cashflows,) * 4
+            invariants['plan'] = None
+            return invariants
+
+        def elec_eq():
+            BT = self.BT
+            if not BT: return 0.
+            return lang_factor * BT.purchase_cost if lang_factor else BT.installed_cost
+
+        def ethanol_eq():
+            if not ethanol_product: return 0.
+            return 1e6 * self.ethanol_group.get_installed_cost()
+
+        def biodiesel_eq():
+            if not biodiesel_product: return 0.
+            biodiesel_group = self.biodiesel_group
+            if lang_factor:
+                return 1e6 * lang_factor * biodiesel_group.get_purchase_cost()
+            else:
+                return 1e6 * biodiesel_group.get_installed_cost()
+
+        def ethanol():
+            if not ethanol_product: return empty_cashflows
+            # Ethanol in gal/yr
+            return yearly_flows(2.98668849 * ethanol_product.F_mass * operating_hours, startup_VOCfrac)
+
+        def converyor_costs():
+            conveyors = [i for i in self.units if isinstance(i, bst.ConveyingBelt)]
+            if lang_factor:
+                return lang_factor * sum([i.purchase_cost for i in conveyors])
+            else:
+                return sum([i.installed_cost for i in conveyors])
+
+        # Parameters are only computed if required by the selected incentives
+        parameter_getters = {
+            'value_added': lambda: FCI,
+            'property_taxable_value': lambda: taxable_property_arr,
+            'property_tax_rate': lambda: self.property_tax,
+            'biodiesel_eq': lambda: construction_flow(biodiesel_eq()).cumsum(),
+            'ethanol_eq': lambda: construction_flow(ethanol_eq()).cumsum(),
+            'fuel_taxable_value': lambda: fuel_value_arr,
+            'fuel_tax_rate': lambda: self.fuel_tax,
+            'sales_taxable_value': lambda: sales_arr, # Regards equipment cost with building materials (foundation, pipping, etc.), installation fees, and biomass flow rate
+            'sales_tax_rate': lambda: sales_tax,
+            'sales_tax_assessed': lambda: sales_tax_arr,
+            'wages': lambda: yearly_flows(self.labor_cost, startup_FOCfrac),
+            'TCI': lambda: self.TCI,
+            'ethanol': ethanol,
+            'elec_eq': lambda: construction_flow(elec_eq()).cumsum(),
+            'jobs_50': lambda: self.jobs_50, # Assumption made by the original lipid-cane biorefinery publication
+            'utility_tax_assessed': lambda: self.utility_tax * yearly_flows(abs(self.utility_cost), startup_FOCfrac), # absolute value of utility cost bc it will likely always be negative
+            'state_income_tax_assessed': lambda: gross_receipts_tax,
+            'property_tax_assessed': lambda: property_tax_arr,
+            'IA_value': lambda: construction_flow(converyor_costs()).cumsum(),
+            'building_mats': lambda: purchase_cost_arr,
+            'NM_value': lambda: elec_eq() + feedstock_value_arr,
+        }
+        # Incentives independent of income taxes are assessed only once
+        independent_plan, dependent_plan = plan.split(dependent_parameters)
+        parameters = {
+            i: parameter_getters[i]() for i in plan.parameters
+            if i not in dependent_parameters
+        }
+        invariants['incentives'] = independent_plan(
+            plant_years, start, **{i: parameters[i] for i in independent_plan.parameters}
         )
-        self.exemptions = exemptions
-        self.deductions = deductions
-        self.credits = credits
-        self.refunds = refunds
-        index = taxable_cashflow > 0.
-        tax[:] = property_tax_arr + fuel_tax_arr + sales_tax_arr # util_tax_arr; utility tax not currently considered
-        tax[index] += federal_assessed_income_tax[index]
-        if self.state_tax_by_gross_receipts:
-            tax[:] += state_assessed_income_tax
+        if dependent_plan.incentive_numbers:
+            invariants['plan'] = dependent_plan
+            invariants['parameters'] = {
+                i: parameters[i] for i in dependent_plan.parameters
+                if i not in dependent_parameters
+            }
+            invariants['plant_years'] = plant_years
+            invariants['start'] = start
+        else:
+            invariants['plan'] = None
+        return invariants
+
+    #: [CashFlowWorkspace] Buffers for cash flow evaluations (see `_get_workspace`).
+    _workspace = None
+
+    #: tuple[1d array] Exemptions, deductions, credits, and refunds of the last cash flow evaluation.
+    _incentive_values = (None,) * 4
+
+    exemptions = incentive_values_property(0, 'exemptions')
+    deductions = incentive_values_property(1, 'deductions')
+    credits = incentive_values_property(2, 'credits')
+    refunds = incentive_values_property(3, 'refunds')
+
+    def _get_workspace(self, plant_years):
+        # Copies of the TEA (e.g., evaluated concurrently) create their own workspace
+        workspace = self._workspace
+        if workspace is None or workspace.owner is not self or workspace.plant_years != plant_years:
+            self._workspace = workspace = CashFlowWorkspace(plant_years, self)
+        return workspace
+
+    def _fill_tax_and_incentives(self, incentives, taxable_cashflow, nontaxable_cashflow, tax, depreciation):
+        # All stages write into the buffers of the workspace
+        np.maximum(taxable_cashflow, 0., out=taxable_cashflow)
+        invariants = self._get_tax_invariants(depreciation)
+        workspace = self._get_workspace(taxable_cashflow.size)
+        federal_assessed_income_tax = np.multiply(taxable_cashflow, self.federal_income_tax, out=workspace.fed_income_tax_assessed)
+        gross_receipts_tax = invariants['gross_receipts_tax']
+        if gross_receipts_tax is None:
+            state_assessed_income_tax = np.multiply(taxable_cashflow, self.state_income_tax, out=workspace.state_income_tax_assessed)
         else:
-            tax[index] += state_assessed_income_tax[index]
-        maximum_incentives = credits + refunds + deductions + exemptions
-        index = maximum_incentives > tax
-        maximum_incentives[index] = tax[index]
-        incentives[:] = maximum_incentives
+            state_assessed_income_tax = gross_receipts_tax
+        index = np.greater(taxable_cashflow, 0., out=workspace.index)
+        tax[:] = invariants['tax']
+        np.add(tax, federal_assessed_income_tax, out=tax, where=index)
+        if gross_receipts_tax is None:
+            np.add(tax, state_assessed_income_tax, out=tax, where=index)
+        else:
+            tax += state_assessed_income_tax
+        plan = invariants['plan']
+        if plan is None:
+            values = invariants['incentives']
+        else:
+            values = plan(
+                invariants['plant_years'], invariants['start'],
+                out=workspace.incentive_values,
+                fed_income_tax_assessed=federal_assessed_income_tax,
+                state_income_tax_assessed=state_assessed_income_tax,
+                **invariants['parameters']
+            )
+            for value, independent_value in zip(values, invariants['incentives']): value += independent_value
+        self._incentive_values = values
+        exemptions, deductions, credits, refunds = values
+        np.add(credits, refunds, out=incentives)
+        incentives += deductions
+        incentives += exemptions
+        np.minimum(incentives, tax, out=incentives)
+
+    def _NPV_with_sales(self, sales, taxable_cashflow, nontaxable_cashflow, depreciation,
+                        sales_coefficients, discount_factors, fill_tax_and_incentives):
+        # Same as `NPV_with_sales` from BioSTEAM, but cash flows are evaluated
+        # in the buffers of the workspace
+        workspace = self._get_workspace(taxable_cashflow.size)
+        taxable = np.multiply(sales_coefficients, sales, out=workspace.taxable_cashflow)
+        taxable += taxable_cashflow
+        tax = workspace.tax
+        incentives = workspace.incentives
+        tax[:] = 0.
+        incentives[:] = 0.
+        fill_tax_and_incentives(incentives, taxable, nontaxable_cashflow, tax, depreciation)
+        cashflow = np.add(nontaxable_cashflow, taxable, out=workspace.cashflow)
+        cashflow += incentives
+        cashflow -= tax
+        cashflow /= discount_factors
+        return cashflow.sum()
+
+    def _get_NPV_args(self):
+        # Return arguments of `_NPV_with_sales` for the current cash flow analysis
+        discount_factors = (1 + self.IRR)**self._get_duration_array()
+        sales_coefficients = np.ones_like(discount_factors)
+        start = self._start
+        sales_coefficients[:start] = 0
+        w0 = self._startup_time
+        sales_coefficients[start] = w0*self.startup_VOCfrac + (1-w0)
+        taxable_cashflow, nontaxable_cashflow, depreciation = self._taxable_nontaxable_depreciation_cashflows()
+        return (taxable_cashflow,
+                nontaxable_cashflow,
+                depreciation,
+                sales_coefficients,
+                discount_factors,
+                self._fill_tax_and_incentives)
+
+    def solve_sales(self):
+        """
+        Return the required additional sales [USD] to reach the breakeven
+        point (NPV = 0) through cash flow analysis.
+
+        Notes
+        -----
+        Taxes and incentives are piecewise linear with respect to sales, so
+        Newton's method is used with the slope of the active linear segment
+        (a one-sided difference in the direction of the root). Once the root
+        lies within the same segment, it converges in a single step (i.e., 2-3
+        cash flow evaluations). Sales are only accepted once the NPV is within
+        1000 USD of zero; otherwise, the default BioSTEAM solver is used as a
+        fallback.
+
+        """
+        args = self._get_NPV_args()
+        if np.isnan(args[0]).any(): return bst.TEA.solve_sales(self)
+        f = self._NPV_with_sales
+        x = self._sales
+        if not np.isfinite(x): x = 0.
+        y = f(x, *args)
+        for i in range(10):
+            if abs(y) < 1000.: break
+            h = max(1e-6 * abs(x), 1.)
+            if y > 0.: h = -h # NPV increases with sales
+            slope = (f(x + h, *args) - y) / h
+            if not slope > 0.: return bst.TEA.solve_sales(self)
+            dx = y / slope
+            x -= dx
+            y = f(x, *args)
+        else:
+            if abs(y) >= 1000.: return bst.TEA.solve_sales(self)
+        self._sales = x
+        return x
+
+    def _fit_NPV_piece(self, obj, attr, value, x):
+        # Return coefficients (x0, v0, y0, a, b, c) of the linear piece of NPV
+        # at the given sales and attribute value, where
+        # NPV = y0 + a*dx + b*dv + c*dx*dv. Differences are one-sided in the
+        # direction of the sweep (i.e., increasing values).
+        h = max(1e-6 * abs(x), 1.)
+        k = 1e-6 * max(abs(value), 1.)
+        args = self._get_NPV_args()
+        y0 = self._NPV_with_sales(x, *args)
+        y1 = self._NPV_with_sales(x + h, *args)
+        setattr(obj, attr, value + k)
+        try:
+            args = self._get_NPV_args()
+            y2 = self._NPV_with_sales(x, *args)
+            y3 = self._NPV_with_sales(x + h, *args)
+        finally:
+            setattr(obj, attr, value)
+        return (x, value, y0, (y1 - y0) / h, (y2 - y0) / k, (y3 - y2 - y1 + y0) / (h * k))
+
+    def solve_price_sweep(self, stream, name, values):
+        """
+        Return the price [USD/kg] of a stream at the break even point (NPV = 0),
+        its derivative with respect to a TEA attribute, and the attribute
+        values at which the derivative is discontinuous (breakpoints). The
+        system is not re-simulated, so the attribute may only change economic
+        assumptions.
+
+        Parameters
+        ----------
+        stream : Stream
+            Stream with variable selling price.
+        name : str
+            TEA scenario attribute (e.g., 'state_income_tax', 'property_tax',
+            'sales_tax', 'fuel_tax').
+        values : 1d array
+            Attribute values.
+
+        Returns
+        -------
+        prices : 1d array
+            Stream price [USD/kg] by value.
+        derivatives : 1d array
+            Derivative of the stream price [USD/kg] with respect to the
+            attribute by value (in the direction of increasing values).
+        breakpoints : 1d array
+            Sorted attribute values where the taxable cash flow of a year
+            changes sign or an incentive reaches its cap (at most one per
+            interval between consecutive values).
+
+        Notes
+        -----
+        NPV is piecewise linear with respect to sales and the property, sales,
+        and fuel tax rates, and piecewise bilinear with respect to sales and
+        the state income tax rate. Within each piece, the break even sales
+        follow from coefficients fitted at a single solution. Each value is
+        checked and refined (i.e., one Newton step along the piece) with one
+        cash flow evaluation and the price is only solved again past a
+        breakpoint, which is located where the solutions of adjacent pieces
+        intersect. Other attributes are also accepted, but may require more
+        solutions. The attribute, the last break even sales, and the last
+        incentive values of the TEA are restored afterwards.
+
+        """
+        values = np.asarray(values, dtype=float)
+        system = self.system
+        price2cost = system._price2cost(stream)
+        if price2cost == 0.: raise ValueError('cannot solve price of empty stream')
+        obj, attr = self._scenario_target(name)
+        # Incentive values may be held in the workspace buffers, which the
+        # sweep overwrites
+        self._incentive_values = tuple([None if i is None else i.copy() for i in self._incentive_values])
+        targets = [(obj, attr), (self, '_sales'), (self, '_tax_invariants'), (self, '_incentive_values')]
+        state = ScenarioOverlay(targets, [getattr(i, j) for i, j in targets])
+        sales = np.zeros(values.size)
+        slopes = np.zeros(values.size)
+        current_prices = np.zeros(values.size)
+        breakpoints = []
+
+        def solve(piece, value):
+            x0, v0, y0, a, b, c = piece
+            return x0 - (y0 + b * (value - v0)) / (a + c * (value - v0))
+
+        piece = last_value = None
+        with state:
+            for i in np.argsort(values, kind='stable'):
+                value = values[i]
+                setattr(obj, attr, value)
+                if piece is not None:
+                    x = solve(piece, value)
+                    y = self._NPV_with_sales(x, *self._get_NPV_args())
+                    if abs(y) < 1000.:
+                        # Within the piece, NPV is linear with respect to sales
+                        x0, v0, y0, a, b, c = piece
+                        x -= y / (a + c * (value - v0))
+                    else:
+                        # Past a breakpoint
+                        self._sales = x
+                        x = self.solve_sales()
+                        last_piece = piece
+                        piece = self._fit_NPV_piece(obj, attr, value, x)
+                        f = lambda v: solve(last_piece, v) - solve(piece, v)
+                        y0 = f(last_value)
+                        y1 = f(value)
+                        if y0 * y1 < 0.:
+                            breakpoints.append(
+                                flx.IQ_interpolation(f, last_value, value, y0, y1, xtol=1e-9 * max(abs(value), 1.), ytol=1e-6)
+                            )
+                else:
+                    x = self.solve_sales()
+                    piece = self._fit_NPV_piece(obj, attr, value, x)
+                x0, v0, y0, a, b, c = piece
+                sales[i] = x
+                slopes[i] = -(b + c * (x - x0)) / (a + c * (value - v0))
+                current_prices[i] = system.get_market_value(stream) / abs(price2cost)
+                last_value = value
+        return current_prices + sales / price2cost, slopes / price2cost, np.array(breakpoints)
+
+    def _scenario_target(self, name):
+        # Return the object and attribute set by a scenario key
+        if name == 'feedstock_price':
+            return self.feedstock, 'price'
+        else:
+            return self, name
+
+    def _set_scenario(self, scenario):
+        # Return original values to restore the scenario
+        original = {}
+        for name, value in scenario.items():
+            obj, attr = self._scenario_target(name)
+            original[name] = getattr(obj, attr)
+            setattr(obj, attr, value)
+        return original
+
+    def compile_scenario(self, scenario):
+        """
+        Return a ScenarioOverlay object that applies an economic scenario
+        when entered as a context manager and reverts it on exit. Compile
+        scenarios that are applied repeatedly (e.g., at every sample) once.
+
+        Parameters
+        ----------
+        scenario : dict
+            TEA attributes by name (e.g., 'state_income_tax', 'F_investment',
+            'electricity_price', 'incentive_numbers'). The 'feedstock_price'
+            [USD/kg] key is also accepted.
+
+        Examples
+        --------
+        >>> baseline = tea.compile_scenario(dict(state_income_tax=0., fuel_tax=0.)) # doctest: +SKIP
+        >>> with baseline: MFSP = tea.solve_price(tea.ethanol_product) # doctest: +SKIP
+
+        """
+        return ScenarioOverlay(
+            [self._scenario_target(i) for i in scenario],
+            scenario.values(),
+        )
+
+    def scenario(self, scenario):
+        """
+        Return a context manager that applies an economic scenario (dict or
+        compiled ScenarioOverlay object) and reverts it on exit.
+        """
+        if isinstance(scenario, ScenarioOverlay): return scenario
+        return self.compile_scenario(scenario)
+
+    def solve_price_across_scenarios(self, stream, scenarios, IRRs=None):
+        """
+        Return the price [USD/kg] of a stream at the break even point (NPV = 0)
+        for each economic scenario, solving all scenario cash flows
+        simultaneously as a (scenarios x years) problem. The system is not
+        re-simulated, so scenarios may only change economic assumptions.
+
+        Parameters
+        ----------
+        stream : Stream
+            Stream with variable selling price.
+        scenarios : Iterable[dict|ScenarioOverlay]
+            TEA attributes by name for each scenario (e.g., 'state_income_tax',
+            'F_investment', 'electricity_price', 'incentive_numbers', 'IRR').
+            The 'feedstock_price' [USD/kg] key is also accepted.
+        IRRs : 1d array, optional
+            Internal rates of return. If given, each scenario is solved at
+            every IRR (i.e., as a (scenarios x IRRs x years) problem). Cash
+            flows of each scenario are computed once, as only discount
+            factors depend on the IRR.
+
+        Returns
+        -------
+        prices : 1d array
+            Stream price [USD/kg] by scenario (and IRR, if given).
+        incentives : 3d array
+            Exemptions, deductions, credits, and refunds (before being capped
+            by taxes) by scenario (and IRR, if given) and year at the break
+            even point.
+
+        """
+        system = self.system
+        price2cost = system._price2cost(stream)
+        if price2cost == 0.: raise ValueError('cannot solve price of empty stream')
+        duration_array = self._get_duration_array()
+        sales_coefficients = np.ones_like(duration_array)
+        start = self._start
+        plant_years = start + self._years
+        sales_coefficients[:start] = 0
+        w0 = self._startup_time
+        sales_coefficients[start] = w0*self.startup_VOCfrac + (1-w0)
+        taxable_cashflows = []
+        nontaxable_cashflows = []
+        invariants = []
+        federal_income_tax = []
+        state_income_tax = []
+        current_prices = []
+        discount_factors = []
+        scenarios = list(scenarios)
+        original_tax_invariants = self._tax_invariants
+        for scenario in scenarios:
+            with self.scenario(scenario):
+                taxable_cashflow, nontaxable_cashflow, depreciation = self._taxable_nontaxable_depreciation_cashflows()
+                invariants.append(self._get_tax_invariants(depreciation))
+                taxable_cashflows.append(taxable_cashflow)
+                nontaxable_cashflows.append(nontaxable_cashflow)
+                federal_income_tax.append(self.federal_income_tax)
+                state_income_tax.append(self.state_income_tax)
+                current_prices.append(system.get_market_value(stream) / abs(price2cost))
+                discount_factors.append((1 + self.IRR)**duration_array)
+        self._tax_invariants = original_tax_invariants
+        if IRRs is None:
+            discount_factors = np.array(discount_factors)
+        else:
+            # Rows are ordered by scenario and then by IRR
+            IRRs = np.asarray(IRRs, dtype=float)
+            K = IRRs.size
+            discount_factors = np.tile((1 + IRRs[:, None])**duration_array, [len(scenarios), 1])
+            taxable_cashflows, nontaxable_cashflows, federal_income_tax, state_income_tax, current_prices = [
+                np.repeat(i, K, axis=0) for i in (taxable_cashflows, nontaxable_cashflows, federal_income_tax, state_income_tax, current_prices)
+            ]
+            invariants = [i for i in invariants for j in range(K)]
+        N = len(invariants)
+        taxable_cashflows = np.array(taxable_cashflows)
+        nontaxable_cashflows = np.array(nontaxable_cashflows)
+        federal_income_tax = np.array(federal_income_tax)[:, None]
+        state_income_tax = np.array(state_income_tax)[:, None]
+        base_tax = np.array([i['tax'] for i in invariants])
+        gross_receipts = np.array([i['gross_receipts_tax'] is not None for i in invariants])
+        gross_receipts_tax = np.zeros([N, plant_years])
+        for i, dct in enumerate(invariants):
+            if gross_receipts[i]: gross_receipts_tax[i] = dct['gross_receipts_tax']
+        independent_incentives = np.array([i['incentives'] for i in invariants]).swapaxes(0, 1)
+
+        # Incentives that depend on income taxes are assessed in groups of
+        # scenarios that share the same incentives
+        groups = {}
+        for i, dct in enumerate(invariants):
+            plan = dct['plan']
+            if plan is None: continue
+            key = (plan, gross_receipts[i])
+            if key in groups: groups[key].append(i)
+            else: groups[key] = [i]
+        groups = [
+            (plan, gross, np.array(index),
+             {name: np.array([invariants[i]['parameters'][name] for i in index])
+              for name in invariants[index[0]]['parameters']})
+            for (plan, gross), index in groups.items()
+        ]
+
+        def NPV_with_sales(sales, incentives):
+            taxable_cashflow = taxable_cashflows + sales[:, None] * sales_coefficients
+            taxable_cashflow[taxable_cashflow < 0.] = 0.
+            federal_assessed_income_tax = taxable_cashflow * federal_income_tax
+            state_assessed_income_tax = taxable_cashflow * state_income_tax
+            state_assessed_income_tax[gross_receipts] = gross_receipts_tax[gross_receipts]
+            index = taxable_cashflow > 0.
+            tax = base_tax + federal_assessed_income_tax * index
+            tax += np.where(gross_receipts[:, None], 1., index) * state_assessed_income_tax
+            incentives[:] = independent_incentives
+            for plan, gross, group, parameters in groups:
+                if not gross: parameters['state_income_tax_assessed'] = state_assessed_income_tax[group]
+                values = plan.batch(
+                    plant_years, start,
+                    fed_income_tax_assessed=federal_assessed_income_tax[group],
+                    **parameters
+                )
+                for i, j in zip(incentives, values): i[group] += j
+            maximum_incentives = incentives.sum(axis=0)
+            cashflow = nontaxable_cashflows + taxable_cashflow + np.minimum(maximum_incentives, tax) - tax
+            return (cashflow / discount_factors).sum(axis=1)
+
+        incentives = np.zeros([4, N, plant_years])
+        x = np.full(N, self._sales if np.isfinite(self._sales) else 0., dtype=float)
+        y = NPV_with_sales(x, incentives)
+        converged = np.abs(y) < 1000.
+        failed = np.zeros(N, bool)
+        for i in range(10):
+            active = ~(converged | failed)
+            if not active.any(): break
+            h = np.maximum(1e-6 * np.abs(x), 1.)
+            h[y > 0.] *= -1 # NPV increases with sales
+            slope = (NPV_with_sales(x + h, incentives) - y) / h
+            failed |= active & ~(slope > 0.)
+            active &= ~failed
+            dx = np.where(active, y, 0.) / np.where(active, slope, 1.)
+            x -= dx
+            y = NPV_with_sales(x, incentives)
+            converged |= active & (np.abs(y) < 1000.)
+        for i in np.flatnonzero(~converged):
+            # Fall back to solving scenario by scenario
+            if IRRs is None:
+                overlay = self.scenario(scenarios[i])
+            else:
+                overlay = self.scenario(scenarios[i // K])
+                overlay = ScenarioOverlay([*overlay.targets, (self, 'IRR')], [*overlay.values, IRRs[i % K]])
+            with overlay:
+                x[i] = self.solve_sales()
+                incentives[:, i] = (self.exemptions, self.deductions, self.credits, self.refunds)
+        prices = np.array(current_prices) + x / price2cost
+        if IRRs is not None:
+            prices = prices.reshape([len(scenarios), K])
+            incentives = incentives.reshape([4, len(scenarios), K, plant_years])
+        return prices, incentives
+
+    def solve_price_across_IRRs(self, stream, IRRs):
+        """
+        Return the price [USD/kg] of a stream at the break even point (NPV = 0)
+        for each internal rate of return (1d array), solving all IRRs
+        simultaneously as an (IRRs x years) problem from a single cash flow
+        analysis (see `solve_price_across_scenarios`).
+        """
+        return self.solve_price_across_scenarios(stream, [{}], IRRs)[0][0]
 
 class ConventionalIncentivesTEA(sc.ConventionalEthanolTEA):
 
@@ -363,6 +939,7 @@ class ConventionalIncentivesTEA(sc.ConventionalEthanolTEA):
                  BT=None,
                  feedstock=None,
                  F_investment=1.,
+                 electricity_price=None,
                  **kwargs):
         super().__init__(*args, **kwargs)
         self.state_income_tax = state_income_tax
@@ -377,6 +954,7 @@ class ConventionalIncentivesTEA(sc.ConventionalEthanolTEA):
         self.feedstock = feedstock
         self.utility_tax = utility_tax
         self.F_investment = F_investment
+        self.electricity_price = electricity_price
         self.BT = BT
         self.TDC_over_FCI = 0.625
         self.jobs_50 = 50
@@ -386,7 +964,28 @@ class ConventionalIncentivesTEA(sc.ConventionalEthanolTEA):
         self.labor_cost *= (26.03/21.40) # BLS labor indices for years 2020/2013
 
     depreciation_incentive_24 = CellulosicIncentivesTEA.depreciation_incentive_24
+    _tax_invariants = None
+    utility_cost = CellulosicIncentivesTEA.utility_cost
+    _get_tax_invariants = CellulosicIncentivesTEA._get_tax_invariants
+    _workspace = None
+    _incentive_values = (None,) * 4
+    exemptions = CellulosicIncentivesTEA.exemptions
+    deductions = CellulosicIncentivesTEA.deductions
+    credits = CellulosicIncentivesTEA.credits
+    refunds = CellulosicIncentivesTEA.refunds
+    _get_workspace = CellulosicIncentivesTEA._get_workspace
     _fill_tax_and_incentives = CellulosicIncentivesTEA._fill_tax_and_incentives
+    _NPV_with_sales = CellulosicIncentivesTEA._NPV_with_sales
+    _get_NPV_args = CellulosicIncentivesTEA._get_NPV_args
+    solve_sales = CellulosicIncentivesTEA.solve_sales
+    _fit_NPV_piece = CellulosicIncentivesTEA._fit_NPV_piece
+    solve_price_sweep = CellulosicIncentivesTEA.solve_price_sweep
+    _scenario_target = CellulosicIncentivesTEA._scenario_target
+    _set_scenario = CellulosicIncentivesTEA._set_scenario
+    compile_scenario = CellulosicIncentivesTEA.compile_scenario
+    scenario = CellulosicIncentivesTEA.scenario
+    solve_price_across_scenarios = CellulosicIncentivesTEA.solve_price_across_scenarios
+    solve_price_across_IRRs = CellulosicIncentivesTEA.solve_price_across_IRRs
 
     def _fill_depreciation_array(self, depreciation, start, years, FCI):
         TDC = self.TDC_over_FCI * FCI
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model for uncertainty and sensitivity analyses of incentivized biorefineries.
+
+"""
+import inspect
+import numpy as np
+import biosteam as bst
+from functools import lru_cache
+
+__all__ = (
+    'ECONOMIC_KINDS',
+    'IncentivesModel',
+)
+
+#: Parameter kinds that only affect the cash flow analysis (i.e., they do not
+#: alter mass and energy balances).
+ECONOMIC_KINDS = frozenset(['isolated'])
+
+#: Private members of BioSTEAM models that BLocS overrides, calls, or reads by
+#: name, and the parameters of methods (None for attributes) as of BioSTEAM
+#: 2.38.
+MODEL_API = {
+    '_update_state': ('self', 'sample', 'convergence_model', 'kwargs'),
+    '_reset_system': ('self',),
+    '_evaluate_sample': ('self', 'sample', 'convergence_model', 'kwargs'),
+    '_samples': None,
+    '_index': None,
+}
+
+@lru_cache(maxsize=None)
+def check_model_api(names=None):
+    """
+    Raise a RuntimeError if private members of BioSTEAM models that BLocS
+    relies on (see `MODEL_API`) are missing or the parameters of methods
+    changed (i.e., the installed BioSTEAM version is not supported).
+
+    Parameters
+    ----------
+    names : tuple[str], optional
+        Names of members to check. Defaults to all.
+
+    """
+    Model = bst.Model
+    slots = {i for cls in Model.__mro__ for i in getattr(cls, '__slots__', ())}
+    for name in MODEL_API if names is None else names:
+        parameters = MODEL_API[name]
+        if parameters is None:
+            valid = name in slots
+        else:
+            method = getattr(Model, name, None)
+            valid = method is not None and tuple(inspect.signature(method).parameters) == parameters
+        if not valid:
+            raise RuntimeError(
+                f"biosteam {bst.__version__} is not supported; 'Model.{name}' is "
+                f"missing or has changed (BLocS is tested with biosteam 2.38)"
+            )
+
+class IncentivesModel(bst.Model):
+    """
+    Create an IncentivesModel object that only re-simulates the system when
+    process parameters change. Economic parameters (i.e., parameters of kind
+    'isolated', such as tax rates, prices, and the location capital cost
+    factor) only affect the cash flow analysis, so samples that differ from
+    the last simulated sample in economic parameters alone reuse the
+    converged simulation and only rerun the TEA.
+
+    Parameters
+    ----------
+    system : System
+        Should reflect the model state.
+    metrics : tuple[Metric]
+        Metrics to be evaluated by model.
+    specification=None : Function, optional
+        Loads specifications once all parameters are set. Specification should
+        simulate the system as well.
+    parameters=None : Iterable[Parameter], optional
+        Parameters to sample from.
+    exception_hook : callable(exception, sample)
+        Function called after a failed evaluation. The exception hook should
+        return either None or metric values given the exception and sample.
+
+    Raises
+    ------
+    RuntimeError
+        If the installed BioSTEAM version is not supported (see
+        `check_model_api`).
+
+    """
+    __slots__ = (
+        '_process_sample', # [1d array|None] Process parameter values of the last simulation.
+        '_sample_key', # [object|None] Unique key of the last sample (see `sample_key`).
+    )
+
+    def __init__(self, *args, **kwargs):
+        # Overridden private methods must match those of the installed BioSTEAM
+        check_model_api(('_update_state', '_reset_system'))
+        super().__init__(*args, **kwargs)
+
+    def _erase(self):
+        super()._erase()
+        self._process_sample = None
+        self._sample_key = None
+
+    @property
+    def sample_key(self):
+        """
+        [object|None] Unique key of the last sample set by the model (a new
+        key is created for every sample, even if parameter values repeat).
+        Metrics may use it to share results computed once per sample.
+        """
+        return self._sample_key
+
+    @property
+    def economic_parameters(self):
+        """tuple[Parameter] Parameters that only affect the cash flow analysis."""
+        return tuple([i for i in self._parameters if i.kind in ECONOMIC_KINDS])
+
+    @property
+    def process_parameters(self):
+        """tuple[Parameter] Parameters that require simulating the system."""
+        return tuple([i for i in self._parameters if i.kind not in ECONOMIC_KINDS])
+
+    def invalidate_simulation(self):
+        """Force the system to be simulated at the next sample."""
+        self._process_sample = None
+
+    def _update_state(self, sample, convergence_model=None, **kwargs):
+        self._sample_key = object()
+        process_sample = []
+        for f, s in zip(self._parameters, sample):
+            f.setter(s if f.scale is None else f.scale * s)
+            if f.kind not in ECONOMIC_KINDS: process_sample.append(s)
+        process_sample = np.array(process_sample)
+        last = self._process_sample
+        if last is not None and last.size == process_sample.size and (last == process_sample).all():
+            return
+        self._process_sample = None
+        if convergence_model:
+            with convergence_model.practice(sample):
+                value = self._specification() if self._specification else self._system.simulate(**kwargs)
+        else:
+            value = self._specification() if self._specification else self._system.simulate(**kwargs)
+        self._process_sample = process_sample
+        return value
+
+    def _reset_system(self):
+        self._process_sample = None
+        super()._reset_system()
+
+    def evaluate_across_coordinate(self, name, f_coordinate, coordinate, **kwargs):
+        if getattr(f_coordinate, 'kind', None) not in ECONOMIC_KINDS:
+            # Coordinate may alter the process; simulate at every sample
+            f_coordinate_ = f_coordinate
+            def f_coordinate(*args):
+                self._process_sample = None
+                return f_coordinate_(*args)
+        return super().evaluate_across_coordinate(name, f_coordinate, coordinate, **kwargs)
+
+    evaluate_across_coordinate.__doc__ = bst.Model.evaluate_across_coordinate.__doc__
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+State scenario data (tax rates, prices, and location capital cost factors)
+and the incentives available in each state. Excel files are parsed once per
+process and, optionally, cached in a compact binary form on disk.
+
+"""
+import os
+import re
+import hashlib
+import numpy as np
+
+__all__ = (
+    'StateTable',
+    'StateIncentives',
+    'load_state_table',
+    'load_state_incentives',
+    'parse_incentive_numbers',
+)
+
+folder = os.path.dirname(__file__)
+state_data_file = os.path.join(folder, 'state_scenarios_for_import.xlsx')
+incentives_info_file = os.path.join(folder, 'incentives_info.xlsx')
+
+#: [str|None] Folder to cache parsed tables on disk (e.g., a user cache
+#: folder); defaults to the BLOCS_CACHE_FOLDER environment variable. If None,
+#: tables are only cached in memory.
+cache_folder = os.environ.get('BLOCS_CACHE_FOLDER')
+
+#: Columns of TEA scenario attributes (see `CellulosicIncentivesTEA._set_scenario`).
+scenario_columns = {
+    'state_income_tax': 'Income Tax Rate (decimal)',
+    'property_tax': 'Property Tax Rate (decimal)',
+    'fuel_tax': 'State Motor Fuel Tax (decimal)',
+    'sales_tax': 'State Sales Tax Rate (decimal)',
+    'electricity_price': 'Electricity Price (USD/kWh)',
+    'F_investment': 'Location Capital Cost Factor (dimensionless)',
+}
+
+#: Columns of feedstock prices by biorefinery.
+feedstock_price_columns = {
+    'corn': 'CN Price (USD/kg)',
+    'cornstover': 'CS Price (USD/kg)',
+    'sugarcane': 'SC Price (USD/kg)',
+}
+
+#: Biorefineries eligible for incentives restricted by feedstock (see
+#: comments in `incentives_info.xlsx`); all other incentives apply to any
+#: biorefinery in the state.
+incentive_biorefineries = {
+    12: ('corn', 'cornstover'), # Corn or cellulosic feedstock only
+    20: ('corn',), # Grain feedstock only
+}
+
+#: State names by postal abbreviation.
+state_names = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
+    'CA': 'California', 'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho',
+    'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas',
+    'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi',
+    'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma',
+    'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah',
+    'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia',
+    'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+
+def parse_incentive_numbers(text):
+    """
+    Return incentive numbers (tuple[int]) from a cell of available incentives
+    (e.g., '1,10,18' or 7). Empty cells have no incentives.
+    """
+    if text is None: return ()
+    if isinstance(text, (int, np.integer)): return (int(text),)
+    if isinstance(text, (float, np.floating)):
+        return () if np.isnan(text) else (int(text),)
+    return tuple([int(i) for i in re.findall(r'\d+', str(text))])
+
+
+class StateIncentives:
+    """
+    Create a StateIncentives object that indexes the incentives available in
+    each state, accounting for incentives that are only available to some
+    biorefineries.
+
+    Parameters
+    ----------
+    incentives : dict[str, Iterable[int]]
+        Incentive numbers by state.
+    biorefineries : dict[int, Iterable[str]], optional
+        Eligible biorefineries by incentive number. Incentives not included
+        are available to all biorefineries. Defaults to `incentive_biorefineries`.
+    overrides : dict[tuple[str, str], Iterable[int]], optional
+        Incentive numbers by state and biorefinery that replace the index.
+
+    """
+    __slots__ = ('incentives', 'biorefineries', 'overrides', '_cache')
+
+    def __init__(self, incentives, biorefineries=None, overrides=None):
+        if biorefineries is None: biorefineries = incentive_biorefineries
+        self.incentives = {i: tuple(sorted(j)) for i, j in incentives.items()}
+        self.biorefineries = {i: frozenset(j) for i, j in biorefineries.items()}
+        self.overrides = {} if overrides is None else {i: tuple(sorted(j)) for i, j in overrides.items()}
+        self._cache = {}
+
+    @property
+    def states(self):
+        """tuple[str] States with incentives."""
+        return tuple(self.incentives)
+
+    def get(self, state, biorefinery=None):
+        """
+        Return the incentive numbers (tuple[int]) available to a biorefinery
+        in a state. If no biorefinery is given, all incentives in the state
+        are returned.
+        """
+        key = (state, biorefinery)
+        cache = self._cache
+        if key in cache: return cache[key]
+        if key in self.overrides:
+            numbers = self.overrides[key]
+        else:
+            numbers = self.incentives.get(state, ())
+            if biorefinery is not None:
+                biorefineries = self.biorefineries
+                numbers = tuple([
+                    i for i in numbers
+                    if i not in biorefineries or biorefinery in biorefineries[i]
+                ])
+        cache[key] = numbers
+        return numbers
+
+    def get_many(self, states, biorefinery=None):
+        """Return the incentive numbers available in each state (list[tuple[int]])."""
+        return [self.get(i, biorefinery) for i in states]
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.incentives)} states>"
+
+
+class StateTable:
+    """
+    Create a StateTable object with numerical state data as a 2d array (states
+    x columns) and text data (e.g., available incentives) by column. States
+    and columns are indexed by position in O(1).
+
+    Parameters
+    ----------
+    states : Sequence[str]
+        State names.
+    columns : Sequence[str]
+        Names of numerical columns.
+    values : 2d array
+        Numerical data by state and column.
+    text : dict[str, Sequence[str]], optional
+        Text data by column and state.
+
+    """
+    __slots__ = (
+        'states', 'columns', 'values', 'text',
+        '_state_index', '_column_index',
+    )
+
+    def __init__(self, states, columns, values, text=None):
+        self.states = states = tuple(states)
+        self.columns = columns = tuple(columns)
+        self.values = values = np.asarray(values, dtype=float)
+        if values.shape != (len(states), len(columns)):
+            raise ValueError('shape of values does not match states and columns')
+        self.text = {} if text is None else {i: tuple(j) for i, j in text.items()}
+        self._state_index = state_index = {}
+        for i, j in enumerate(states): state_index.setdefault(j, i) # First row of duplicates
+        self._column_index = {j: i for i, j in enumerate(columns)}
+
+    def state_index(self, state):
+        """Return the row of a state."""
+        try:
+            return self._state_index[state]
+        except KeyError:
+            raise ValueError(f"state '{state}' not in table") from None
+
+    def column_index(self, column):
+        """Return the position of a numerical column."""
+        try:
+            return self._column_index[column]
+        except KeyError:
+            raise ValueError(f"column '{column}' not in table") from None
+
+    def column(self, column):
+        """Return values of a numerical column by state (1d array)."""
+        return self.values[:, self.column_index(column)]
+
+    def get(self, state, column):
+        """Return the value of a state in a numerical or text column."""
+        if column in self.text: return self.text[column][self.state_index(state)]
+        return float(self.values[self.state_index(state), self.column_index(column)])
+
+    def scenario(self, state, biorefinery=None):
+        """
+        Return TEA scenario attributes by name for a state (see
+        `CellulosicIncentivesTEA._set_scenario`), including the feedstock
+        price if the biorefinery is given.
+
+        """
+        row = self.values[self.state_index(state)]
+        scenario = {i: float(row[self.column_index(j)]) for i, j in scenario_columns.items()}
+        if biorefinery is not None:
+            scenario['feedstock_price'] = float(row[self.column_index(feedstock_price_columns[biorefinery])])
+        return scenario
+
+    def __len__(self):
+        return len(self.states)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.states)} states, {len(self.columns) + len(self.text)} columns>"
+
+
+def _parse_state_table(file):
+    import pandas as pd
+    data = pd.read_excel(file, index_col=[0])
+    numerical = [i for i in data.columns if pd.api.types.is_numeric_dtype(data[i])]
+    text = {
+        i: ['' if pd.isna(j) else str(j) for j in data[i]]
+        for i in data.columns if i not in numerical
+    }
+    return StateTable(
+        [str(i) for i in data.index], [str(i) for i in numerical],
+        data[numerical].to_numpy(dtype=float), text,
+    )
+
+def _save_state_table(file, table):
+    text_columns = list(table.text)
+    np.savez(
+        file,
+        states=np.array(table.states, dtype=str),
+        columns=np.array(table.columns, dtype=str),
+        values=table.values,
+        text_columns=np.array(text_columns, dtype=str),
+        text=np.array([table.text[i] for i in text_columns], dtype=str).reshape([len(text_columns), len(table.states)]),
+    )
+
+def _load_state_table(file):
+    with np.load(file, allow_pickle=False) as data:
+        return StateTable(
+            data['states'].tolist(), data['columns'].tolist(), data['values'],
+            dict(zip(data['text_columns'].tolist(), data['text'].tolist())),
+        )
+
+_state_tables = {}
+
+def _load_table(file):
+    file = os.path.abspath(file)
+    stat = os.stat(file)
+    key = (file, stat.st_mtime_ns, stat.st_size)
+    if key in _state_tables: return _state_tables[key]
+    if cache_folder is None:
+        table = _parse_state_table(file)
+    else:
+        name = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+        cache_file = os.path.join(cache_folder, f'state_table_{name}.npz')
+        try:
+            table = _load_state_table(cache_file)
+        except (OSError, ValueError, KeyError):
+            table = _parse_state_table(file)
+            try:
+                os.makedirs(cache_folder, exist_ok=True)
+                temporary_file = cache_file + '.tmp.npz'
+                _save_state_table(temporary_file, table)
+                os.replace(temporary_file, cache_file)
+            except OSError:
+                pass # Cache is optional (e.g., read-only folder)
+    _state_tables[key] = table
+    return table
+
+def load_state_table(file=None):
+    """
+    Return a StateTable object of state scenario data. The Excel file is
+    parsed only once; tables are cached in memory and, if `cache_folder` is
+    set, on disk in a binary form by file path, modification time, and size.
+
+    Parameters
+    ----------
+    file : str, optional
+        Excel file with states as the first column. Defaults to
+        `state_scenarios_for_import.xlsx` in this folder.
+
+    """
+    if file is None: file = state_data_file
+    return _load_table(file)
+
+_state_incentives = {}
+
+def load_state_incentives(file=None, overrides=None):
+    """
+    Return a StateIncentives object that indexes the incentives available in
+    each state. The index is built once per file (see `load_state_table` for
+    caching).
+
+    Parameters
+    ----------
+    file : str, optional
+        Either an Excel file of incentives with their state abbreviations
+        (i.e., a "State" column, as in `incentives_info.xlsx`) or an Excel
+        file of states with an "Incentives Available" column. Defaults to
+        `incentives_info.xlsx` in this folder.
+    overrides : dict[tuple[str, str], Iterable[int]], optional
+        Incentive numbers by state and biorefinery that replace the index.
+
+    """
+    if file is None: file = incentives_info_file
+    table = _load_table(file)
+    if table in _state_incentives:
+        incentives = _state_incentives[table]
+    else:
+        incentives = {}
+        if 'Incentives Available' in table.text:
+            for state, text in zip(table.states, table.text['Incentives Available']):
+                numbers = parse_incentive_numbers(text)
+                if numbers: incentives.setdefault(state, set()).update(numbers)
+        else:
+            for number, state in zip(table.states, table.text['State']):
+                state = state_names[state.strip().upper()]
+                incentives.setdefault(state, set()).add(int(number))
+        _state_incentives[table] = incentives
+    return StateIncentives(incentives, overrides=overrides)
@@ -16,24 +16,34 @@ been added for consideration as of January 18, 2024.
 """
 
 import numpy as np
-from inspect import signature
+from functools import lru_cache
+from importlib.util import find_spec
 
 __all__ = (
     'EXEMPTIONS',
     'DEDUCTIONS',
     'CREDITS',
     'REFUNDS',
+    'EXPIRED',
+    'INCENTIVES',
+    'Incentive',
+    'IncentivePlan',
+    'register_incentive',
+    'get_incentive_plan',
     'determine_exemption_amount',
     'determine_deduction_amount',
     'determine_credit_amount',
     'determine_refund_amount',
     'determine_tax_incentives',
+    'determine_tax_incentives_batch',
+    'determine_tax_incentives_across_starts',
 )
 
-EXEMPTIONS = set(range(1, 6))
-DEDUCTIONS = set(range(6, 7))
-CREDITS = set(range(7, 18))
-REFUNDS = set(range(18, 21))
+# Incentive numbers by kind; filled as incentives are registered
+EXEMPTIONS = set()
+DEDUCTIONS = set()
+CREDITS = set()
+REFUNDS = set()
 
 def check_missing_parameter(p, name):
     if p is None: raise ValueError(f"missing parameter '{name}'")
@@ -45,26 +55,549 @@ def assess_incentive(start, duration, plant_years, incentive, amount, assessed_t
     start = max(start, assessed_tax.argmax())
     if start + duration > plant_years: start = plant_years - duration
     incentive[start: start + duration] = amount
-    if ub is not None: incentive[incentive > ub] = ub
-    incentive = np.where(
-        incentive > assessed_tax,
-        assessed_tax,
-        incentive
-    )
-    return incentive
+    if ub is not None: np.minimum(incentive, ub, out=incentive)
+    np.minimum(incentive, assessed_tax, out=incentive)
+    return np.maximum(incentive, 0., out=incentive) # Negative amounts (e.g., taxable values) are not incentives
 
 def assess_incentive_arr(start, duration, plant_years, incentive, amount, assessed_tax, ub=None):
     start = max(start, assessed_tax.argmax())
     if start + duration > plant_years: start = plant_years - duration
     incentive[start: start + duration] = amount[start: start + duration]
-    if ub is not None: incentive[incentive > ub] = ub
-    incentive = np.where(
-        incentive > assessed_tax,
-        assessed_tax,
-        incentive
-    )
+    if ub is not None: np.minimum(incentive, ub, out=incentive)
+    np.minimum(incentive, assessed_tax, out=incentive)
+    return np.maximum(incentive, 0., out=incentive)
+
+#: bool Whether all incentives of a plan are assessed in a single compiled
+#: kernel (see `assess_incentives`). Defaults to True if Numba is installed;
+#: otherwise, incentives are assessed one by one with NumPy.
+JIT = find_spec('numba') is not None
+
+# Incentive modes in compiled kernels
+LUMP, YEARLY, WINDOW = 0, 1, 2
+
+def assess_incentives(plant_years, start, kinds, durations, modes, prefill,
+                      ubs, factors, amounts, basis_rates, rates, bases,
+                      assessed_taxes, out):
+    """
+    Assess incentives and write their totals by kind (i.e., exemptions,
+    deductions, credits, and refunds) to the first four rows of `out` in a
+    single loop. This kernel fuses
+    `assess_incentive` and `assess_incentive_arr` (i.e., shifting the start
+    to the year of maximum assessed tax, capping at `ub`, capping at the
+    assessed tax, and clipping negative amounts to zero) and is compiled with
+    Numba by `IncentivePlan` objects, if installed.
+
+    Parameters
+    ----------
+    plant_years : int
+        Number of years plant will operate.
+    start : int
+        Year incentives start.
+    kinds, durations, modes : 1d array[int]
+        Index of the incentive kind (in the order of KINDS), number of years
+        incentive is given (negative for plant years), and mode (LUMP,
+        YEARLY, or WINDOW) by incentive.
+    prefill : 1d array[bool]
+        Whether the amount is also given over the nominal years of the
+        incentive by incentive.
+    ubs, factors : 1d array
+        Maximum incentive per year and multiplier of yearly bases by incentive.
+    amounts, basis_rates, rates : tuple[float]
+        Lump amounts, rates multiplied by yearly bases, and rates multiplied
+        by the incentive after assessment by incentive.
+    bases, assessed_taxes : tuple[1d array]
+        Yearly bases and tax assessed per year by incentive.
+    out : 2d array
+        Exemptions, deductions, credits, and refunds (rows) per year.
+
+    """
+    for i in range(4):
+        for year in range(plant_years): out[i, year] = 0.
+    for n in range(len(kinds)):
+        assessed_tax = assessed_taxes[n]
+        basis = bases[n]
+        duration = durations[n]
+        if duration < 0: duration = plant_years
+        mode = modes[n]
+        # Same as argmax (i.e., first maximum or NaN)
+        shifted_start = 0
+        for year in range(plant_years):
+            tax = assessed_tax[year]
+            if tax != tax:
+                shifted_start = year
+                break
+            if tax > assessed_tax[shifted_start]: shifted_start = year
+        if shifted_start < start: shifted_start = start
+        if shifted_start + duration > plant_years: shifted_start = plant_years - duration
+        ub = ubs[n]
+        factor = factors[n]
+        basis_rate = basis_rates[n]
+        rate = rates[n]
+        amount = amounts[n]
+        value = out[kinds[n]]
+        for year in range(plant_years):
+            offset = year - shifted_start
+            if 0 <= offset < duration:
+                if mode == LUMP:
+                    incentive = amount
+                elif mode == YEARLY:
+                    incentive = basis_rate * (factor * basis[year])
+                elif start + offset < plant_years:
+                    incentive = basis_rate * (factor * basis[start + offset])
+                else:
+                    incentive = 0.
+            elif prefill[n] and start <= year < start + duration:
+                incentive = amount if mode == LUMP else basis_rate * (factor * basis[year])
+            else:
+                incentive = 0.
+            if incentive > ub: incentive = ub
+            tax = assessed_tax[year]
+            if tax != tax or incentive > tax: incentive = tax
+            if incentive < 0.: incentive = 0.
+            value[year] += incentive * rate
+
+@lru_cache(maxsize=1)
+def _get_assess_incentives():
+    # Numba is only imported (and the kernel compiled) on first use, so the
+    # tax incentive calculators can still be imported quickly
+    try:
+        import numba
+    except ImportError:
+        return assess_incentives
+    return numba.njit(cache=True)(assess_incentives)
+
+def _shifted_starts(start, duration, plant_years, assessed_tax):
+    start = np.maximum(start, assessed_tax.argmax(axis=1))
+    return np.where(start + duration > plant_years, plant_years - duration, start)
+
+def assess_incentive_batch(start, duration, plant_years, amount, assessed_tax,
+                           ub=None, basis_start=None, prefill=False):
+    """
+    Return 2d array of incentives (samples x years). This is the batch
+    counterpart of `assess_incentive` and `assess_incentive_arr`.
+
+    Parameters
+    ----------
+    start : int or 1d array[int]
+        Year incentive starts (or by sample).
+    duration : int
+        Number of years incentive is given.
+    plant_years : int
+        Number of years plant will operate.
+    amount : 2d array
+        Incentive amount as a column (samples x 1) or per year
+        (samples x plant_years).
+    assessed_tax : 2d array
+        Tax assessed per year; incentives may not exceed it (samples x plant_years).
+    ub : float, optional
+        Maximum incentive per year.
+    basis_start : int, optional
+        If given, yearly amounts are read from this year onwards regardless
+        of how the start of the incentive is shifted.
+    prefill : bool, optional
+        Whether the amount is also given over the years starting at `start`
+        before the start is shifted.
+
+    """
+    shifted_start = _shifted_starts(start, duration, plant_years, assessed_tax)
+    if np.ndim(start): start = np.reshape(start, [-1, 1])
+    years = np.arange(plant_years)
+    offset = years - shifted_start[:, None]
+    window = (offset >= 0) & (offset < duration)
+    if prefill: window |= (years >= start) & (years < start + duration)
+    if basis_start is not None and np.ndim(amount) == 2 and amount.shape[1] != 1:
+        if np.ndim(basis_start): basis_start = np.reshape(basis_start, [-1, 1])
+        index = basis_start + offset
+        window &= index < plant_years # No amounts past the last year
+        index = index.clip(0, plant_years - 1)
+        amount = np.take_along_axis(np.broadcast_to(amount, assessed_tax.shape), index, 1)
+    incentive = np.where(window, amount, 0.)
+    if ub is not None: np.minimum(incentive, ub, out=incentive)
+    np.minimum(incentive, assessed_tax, out=incentive)
+    return np.maximum(incentive, 0., out=incentive)
+
+class Incentive:
+    """
+    Create an Incentive object that defines how a tax incentive is assessed.
+    The yearly incentive is the `factor` times the `basis` (times the
+    `basis_rate`, if any) over `duration` years, capped by `ub` and by the
+    `assessed` tax. Exemptions and deductions are multiplied by the tax `rate`
+    after assessment.
+
+    Parameters
+    ----------
+    number : int
+        Incentive number (see incentives_info.xlsx).
+    kind : str
+        'exemption', 'deduction', 'credit', or 'refund'.
+    label : str
+        Name used in manuscript (e.g., 'E1' for "Exemption 1").
+    duration : int, optional
+        Number of years incentive is given. Defaults to plant years.
+    basis : str
+        Name of parameter the incentive amount is based on.
+    assessed : str
+        Name of parameter (per year) that incentives may not exceed.
+    mode : str, optional
+        * 'lump': Basis is a single value given every year of the incentive.
+        * 'yearly': Basis is given per year and read over the (shifted) years
+          of the incentive.
+        * 'window': Basis is given per year and read from the nominal start
+          of the incentive, regardless of how the start is shifted.
+        Defaults to 'lump'.
+    factor : float or Callable, optional
+        Multiplier of the basis or function of the basis that returns the
+        amount. Defaults to 1.
+    basis_rate : str, optional
+        Name of rate parameter multiplied by the basis before assessment.
+    rate : str, optional
+        Name of rate parameter multiplied by the incentive after assessment.
+    ub : float, optional
+        Maximum incentive per year [$/yr].
+    prefill : bool, optional
+        Whether the amount is also given over the nominal years of the
+        incentive before the start is shifted. Defaults to False.
+    expired : bool, optional
+        Whether the incentive is no longer in effect. Defaults to False.
+
+    """
+    __slots__ = ('number', 'kind', 'label', 'duration', 'basis', 'assessed',
+                 'mode', 'factor', 'basis_rate', 'rate', 'ub', 'prefill',
+                 'expired', 'parameters')
+
+    def __init__(self, number, kind, label, duration, basis, assessed,
+                 mode='lump', factor=None, basis_rate=None, rate=None, ub=None,
+                 prefill=False, expired=False):
+        if kind not in KINDS: raise ValueError(f"invalid incentive kind {kind!r}")
+        if mode not in ('lump', 'yearly', 'window'): raise ValueError(f"invalid incentive mode {mode!r}")
+        self.number = number
+        self.kind = kind
+        self.label = label
+        self.duration = duration
+        self.basis = basis
+        self.assessed = assessed
+        self.mode = mode
+        self.factor = factor
+        self.basis_rate = basis_rate
+        self.rate = rate
+        self.ub = ub
+        self.prefill = prefill
+        self.expired = expired
+        #: tuple[str] Names of parameters required to assess the incentive.
+        self.parameters = tuple(dict.fromkeys(
+            [i for i in (basis, basis_rate, assessed, rate) if i is not None]
+        ))
+
+    def amount(self, params, out=None):
+        """
+        Return incentive amount before assessment given a dictionary of
+        parameters. Yearly amounts are written to `out`, if given.
+        """
+        amount = params[self.basis]
+        factor = self.factor
+        basis_rate = self.basis_rate
+        if out is None or callable(factor) or amount.__class__ is not np.ndarray:
+            if factor is not None: amount = factor(amount) if callable(factor) else factor * amount
+            if basis_rate is not None: amount = params[basis_rate] * amount
+        else:
+            if factor is not None: amount = np.multiply(amount, factor, out=out)
+            if basis_rate is not None: amount = np.multiply(amount, params[basis_rate], out=out)
+        return amount
+
+    def assess(self, plant_years, start, params, out=None):
+        """
+        Return 1d array of incentives per year. If `out` (2 x plant_years) is
+        given, incentives are assessed in place (i.e., without allocating
+        arrays) and written to its first row; the second row is used as a
+        buffer.
+        """
+        duration = plant_years if self.duration is None else self.duration
+        assessed_tax = params[self.assessed]
+        if out is None:
+            amount = self.amount(params)
+            incentive = np.zeros(plant_years)
+        else:
+            incentive, buffer = out
+            amount = self.amount(params, buffer)
+            incentive[:] = 0.
+        if self.mode == 'yearly':
+            incentive = assess_incentive_arr(start, duration, plant_years, incentive, amount, assessed_tax, self.ub)
+        else:
+            if self.mode == 'window': amount = amount[start: start + duration]
+            if self.prefill: incentive[start: start + duration] = amount
+            incentive = assess_incentive(start, duration, plant_years, incentive, amount, assessed_tax, self.ub)
+        if self.rate is not None: incentive *= params[self.rate]
+        return incentive
+
+    def assess_batch(self, plant_years, start, params):
+        """Return 2d array of incentives (samples x years) given 2d parameters (see `determine_tax_incentives_batch`)."""
+        duration = plant_years if self.duration is None else self.duration
+        incentive = assess_incentive_batch(
+            start, duration, plant_years, self.amount(params),
+            params[self.assessed], self.ub,
+            basis_start=start if self.mode == 'window' else None,
+            prefill=self.prefill,
+        )
+        if self.rate is not None: incentive *= params[self.rate]
+        return incentive
+
+    def check_parameters(self, params):
+        for i in self.parameters: check_missing_parameter(params.get(i), i)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.number}/{self.label} ({self.kind})>"
+
+
+def _C7_credit(TCI):
+    # There are other provisions to the incentive but they are more difficult
+    # to model so assume the maximum value is achieved via these provisions
+    return np.where(TCI <= 3e5, 0.07, np.where(TCI <= 1e6, 0.14, 0.18)) * TCI
+
+KINDS = ('exemption', 'deduction', 'credit', 'refund')
+
+#: dict[int, Incentive] All incentives by number. Credits and refunds are cash
+#: flows (i.e., DON'T MULTIPLY BY TAX RATE), exemptions and deductions are
+#: multiplied by their tax rate.
+INCENTIVES = {}
+
+def register_incentive(incentive):
+    """Register incentive so that it can be selected by number."""
+    number = incentive.number
+    if number in INCENTIVES: raise ValueError(f"incentive number {number} already registered")
+    INCENTIVES[number] = incentive
+    KIND_SETS[incentive.kind].add(number)
     return incentive
 
+KIND_SETS = {
+    'exemption': EXEMPTIONS,
+    'deduction': DEDUCTIONS,
+    'credit': CREDITS,
+    'refund': REFUNDS,
+}
+
+for incentive in (
+    # Exemptions
+    Incentive(1, 'exemption', 'E1', 20, 'value_added', 'property_taxable_value', # Value added to property, assume FCI
+              rate='property_tax_rate', prefill=True, expired=True),
+    Incentive(2, 'exemption', 'E2', 10, 'property_taxable_value', 'property_taxable_value', 'yearly', # Exempt amount is the entire amount of state property tax assessed
+              rate='property_tax_rate'),
+    Incentive(3, 'exemption', 'E3', 10, 'ethanol_eq', 'property_taxable_value', 'yearly',
+              rate='property_tax_rate'),
+    Incentive(4, 'exemption', 'E4', None, 'fuel_taxable_value', 'fuel_taxable_value', 'yearly', # Exempt amount is the entire amount of state fuel tax assessed
+              rate='fuel_tax_rate'),
+    Incentive(5, 'exemption', 'E5', None, 'property_taxable_value', 'property_taxable_value', 'yearly', # Exempt amount is the entire amount of state property tax assessed
+              rate='property_tax_rate'),
+    # Deductions
+    Incentive(6, 'deduction', 'D1', None, 'NM_value', 'sales_taxable_value', 'yearly',
+              rate='sales_tax_rate'),
+    # Credits
+    Incentive(7, 'credit', 'C1', 10, 'TCI', 'state_income_tax_assessed', # Actually 'qualified capital investment', assume TCI
+              factor=0.015),
+    Incentive(8, 'credit', 'C2', 22, 'TCI', 'state_income_tax_assessed', # Actually 'qualified investment', assume TCI
+              factor=0.03, ub=7.5e5, expired=True),
+    Incentive(9, 'credit', 'C3', 5, 'ethanol', 'state_income_tax_assessed', 'yearly', # Fuel content of ethanol is 76100 btu/gal
+              factor=76100 * 0.2 / 76000, ub=3e6, expired=True),
+    Incentive(10, 'credit', 'C4', 5, 'TCI', 'state_income_tax_assessed', # Actually just 'a percentage of qualifying investment', assume 5% of TCI over 5 years, no max specified but may be inaccurate
+              factor=0.05 / 5, expired=True),
+    Incentive(11, 'credit', 'C5', 15, 'state_income_tax_assessed', 'state_income_tax_assessed', 'yearly'), # Credit amount is the entire amount of state income tax assessed
+    Incentive(12, 'credit', 'C6', None, 'ethanol', 'state_income_tax_assessed', 'yearly',
+              ub=5e6),
+    Incentive(13, 'credit', 'C7', 2, 'TCI', 'state_income_tax_assessed', # Duration estimated, incentive description is not clear
+              factor=_C7_credit, ub=1e6),
+    Incentive(14, 'credit', 'C8', 7, 'TCI', 'property_tax_assessed', # Actually cost of constructing and equipping facility; credit must be taken in equal installments over duration
+              factor=0.25 / 7, expired=True),
+    Incentive(15, 'credit', 'C9', 15, 'elec_eq', 'state_income_tax_assessed', 'window',
+              factor=0.25, ub=6.5e5, expired=True),
+    Incentive(16, 'credit', 'C10', 20, 'state_income_tax_assessed', 'state_income_tax_assessed', 'window', # Credit amount depends on amount of state income tax assessed
+              factor=0.75),
+    Incentive(17, 'credit', 'C11', 5, 'jobs_50', 'state_income_tax_assessed', # Number of jobs paying 50k+/year
+              factor=500, ub=1.75e5),
+    # Refunds
+    Incentive(18, 'refund', 'R1', 1, 'IA_value', 'sales_tax_assessed', 'yearly', # Fees paid to (sub)contractors + cost of racks, shelving, conveyors
+              basis_rate='sales_tax_rate', expired=True),
+    Incentive(19, 'refund', 'R2', 1, 'building_mats', 'sales_tax_assessed', 'yearly', # Cost of building and construction materials
+              basis_rate='sales_tax_rate'),
+    Incentive(20, 'refund', 'R3', None, 'ethanol', 'state_income_tax_assessed', 'yearly',
+              factor=0.2, ub=6e6),
+): register_incentive(incentive)
+del incentive
+
+#: set[int] Incentives no longer in effect.
+EXPIRED = {i.number for i in INCENTIVES.values() if i.expired}
+
+def _determine_amount(kind, incentive_number, plant_years, start, params):
+    incentive = INCENTIVES.get(incentive_number)
+    if incentive is None or incentive.kind != kind: return np.zeros(plant_years)
+    incentive.check_parameters(params)
+    return incentive.assess(plant_years, start, params)
+
+
+class IncentivePlan:
+    """
+    Create an IncentivePlan object that assesses a set of incentives
+    grouped into exemptions, deductions, credits, and refunds.
+
+    Parameters
+    ----------
+    incentive_numbers : frozenset[int]
+        Incentive types.
+
+    Raises
+    ------
+    ValueError
+        On invalid incentive number.
+
+    """
+    __slots__ = ('incentive_numbers', 'groups', 'parameters', 'incentives', 'kernel_args')
+
+    def __init__(self, incentive_numbers):
+        self.incentive_numbers = incentive_numbers = frozenset(incentive_numbers)
+        groups = {i: [] for i in KINDS}
+        for i in sorted(incentive_numbers):
+            if i not in INCENTIVES: raise ValueError(f"invalid incentive number '{i}'")
+            incentive = INCENTIVES[i]
+            groups[incentive.kind].append(incentive)
+        #: tuple[tuple[Incentive]] Incentives by kind (in the order of KINDS).
+        self.groups = tuple([tuple(groups[i]) for i in KINDS])
+        #: tuple[str] Names of parameters required by the incentives.
+        self.parameters = tuple(dict.fromkeys(
+            [j for i in sorted(incentive_numbers) for j in INCENTIVES[i].parameters]
+        ))
+        #: tuple[Incentive] Incentives in the order of assessment.
+        self.incentives = incentives = sum(self.groups, ())
+        #: tuple[1d array] Constant arguments of `assess_incentives` (kinds,
+        #: durations, modes, prefill, ubs, and factors).
+        self.kernel_args = (
+            np.array([KINDS.index(i.kind) for i in incentives], dtype=int),
+            np.array([-1 if i.duration is None else i.duration for i in incentives], dtype=int),
+            np.array([{'lump': LUMP, 'yearly': YEARLY, 'window': WINDOW}[i.mode] for i in incentives], dtype=int),
+            np.array([i.prefill and i.mode != 'yearly' for i in incentives], dtype=bool),
+            np.array([np.inf if i.ub is None else i.ub for i in incentives], dtype=float),
+            np.array([1. if i.factor is None or callable(i.factor) else i.factor for i in incentives], dtype=float),
+        )
+
+    def check_parameters(self, params):
+        for i in self.parameters: check_missing_parameter(params.get(i), i)
+
+    def _assess(self, plant_years, start, params, out):
+        # Assess all incentives in a single call to `assess_incentives`
+        amounts = []
+        basis_rates = []
+        rates = []
+        bases = []
+        assessed_taxes = []
+        for i in self.incentives:
+            assessed_tax = np.ascontiguousarray(params[i.assessed], dtype=float)
+            basis = params[i.basis]
+            if np.ndim(basis) == 0:
+                amounts.append(float(i.amount(params)))
+                basis = assessed_tax # Not used
+            else:
+                amounts.append(0.)
+                if callable(i.factor): basis = i.factor(basis)
+                basis = np.ascontiguousarray(basis, dtype=float)
+            basis_rates.append(1. if i.basis_rate is None else float(params[i.basis_rate]))
+            rates.append(1. if i.rate is None else float(params[i.rate]))
+            bases.append(basis)
+            assessed_taxes.append(assessed_tax)
+        _get_assess_incentives()(
+            plant_years, start, *self.kernel_args, tuple(amounts),
+            tuple(basis_rates), tuple(rates), tuple(bases),
+            tuple(assessed_taxes), out
+        )
+        return tuple(out[:4])
+
+    def split(self, parameters):
+        """
+        Return a tuple of plans with the incentives that are independent of
+        and dependent on the given parameters, respectively.
+        """
+        parameters = set(parameters)
+        independent = []
+        dependent = []
+        for i in self.incentive_numbers:
+            if parameters.isdisjoint(INCENTIVES[i].parameters): independent.append(i)
+            else: dependent.append(i)
+        return get_incentive_plan(independent), get_incentive_plan(dependent)
+
+    def __call__(self, plant_years, start=0, out=None, **params):
+        """
+        Return a tuple of 1d arrays for tax exemptions, deductions, credits,
+        and refunds. If `out` (6 x plant_years) is given, incentives are
+        assessed in place and written to its first four rows; the last two
+        rows are used as buffers.
+        """
+        self.check_parameters(params)
+        if JIT and self.incentives:
+            if out is None: out = np.zeros([4, plant_years])
+            return self._assess(plant_years, start, params, out)
+        elif out is not None:
+            values = out[:4]
+            buffers = out[4:]
+            values[:] = 0.
+            for value, group in zip(values, self.groups):
+                for i in group: value += i.assess(plant_years, start, params, buffers)
+            return tuple(values)
+        values = []
+        for group in self.groups:
+            if group:
+                value = group[0].assess(plant_years, start, params)
+                for i in group[1:]: value += i.assess(plant_years, start, params)
+            else:
+                value = np.zeros(plant_years)
+            values.append(value)
+        return tuple(values)
+
+    def batch(self, plant_years, start=0, **params):
+        """
+        Return a tuple of 2d arrays (samples x plant_years) for tax
+        exemptions, deductions, credits, and refunds. The start year may
+        also be given by sample (1d array).
+        """
+        self.check_parameters(params)
+        if np.ndim(start):
+            start = np.asarray(start, dtype=int)
+            samples = start.size
+        else:
+            samples = None
+        samples, params = _batch_parameters(plant_years, {i: params[i] for i in self.parameters}, samples)
+        values = []
+        for group in self.groups:
+            value = np.zeros((samples, plant_years))
+            for i in group: value += i.assess_batch(plant_years, start, params)
+            values.append(value)
+        return tuple(values)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({sorted(self.incentive_numbers)})"
+
+
+@lru_cache(maxsize=256)
+def _get_incentive_plan(incentive_numbers):
+    return IncentivePlan(incentive_numbers)
+
+def get_incentive_plan(incentive_numbers):
+    """
+    Return the IncentivePlan object for the given incentive numbers. Plans are
+    cached by the frozenset of incentive numbers, so the incentives and the
+    parameters they require are only resolved once.
+
+    Parameters
+    ----------
+    incentive_numbers : frozenset[int]
+        Incentive types.
+
+    Raises
+    ------
+    ValueError
+        On invalid incentive number.
+
+    """
+    if incentive_numbers.__class__ is not frozenset:
+        incentive_numbers = frozenset(incentive_numbers)
+    return _get_incentive_plan(incentive_numbers)
+
+
 def determine_exemption_amount(incentive_number,
                                plant_years,
                                property_taxable_value=None,
@@ -102,41 +635,16 @@ def determine_exemption_amount(incentive_number,
         Year incentive starts. Defaults to 0.
 
     """
-    lcs = locals()
-    exemption = np.zeros((plant_years,))
-    if incentive_number == 1: #Referred to as Incentive E1 (for "Exemption 1") in manuscript
-        params = ('value_added', 'property_taxable_value', 'property_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        exemption_amount = value_added # Value added to property, assume FCI
-        duration = 20
-        exemption[start: start + duration] = exemption_amount
-        exemption = assess_incentive(start, duration, plant_years, exemption, exemption_amount, property_taxable_value)
-        exemption *= property_tax_rate
-    elif incentive_number == 2: #Referred to as Incentive E2 in manuscript
-        params = ('property_taxable_value', 'property_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = 10
-        exemption = assess_incentive_arr(start, duration, plant_years, exemption, property_taxable_value, property_taxable_value)
-        exemption *= property_tax_rate # Exempt amount is the entire amount of state property tax assessed
-    elif incentive_number == 3: #Referred to as Incentive E3 in manuscript
-        params = ('ethanol_eq', 'property_taxable_value', 'property_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = 10
-        exemption = assess_incentive_arr(start, duration, plant_years, exemption, ethanol_eq, property_taxable_value)
-        exemption *= property_tax_rate
-    elif incentive_number == 4: #Referred to as Incentive E4 in manuscript
-        params = ('fuel_tax_rate', 'property_taxable_value', 'property_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = plant_years
-        exemption = assess_incentive_arr(start, duration, plant_years, exemption, fuel_taxable_value, fuel_taxable_value)
-        exemption *= fuel_tax_rate # Exempt amount is the entire amount of state fuel tax assessed
-    elif incentive_number == 5: #Referred to as Incentive E5 in manuscript
-        params = ('fuel_tax_rate', 'property_taxable_value', 'property_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = plant_years
-        exemption = assess_incentive_arr(start, duration, plant_years, exemption, property_taxable_value, property_taxable_value)
-        exemption *= property_tax_rate # Exempt amount is the entire amount of state property tax assessed
-    return exemption
+    params = dict(
+        property_taxable_value=property_taxable_value,
+        property_tax_rate=property_tax_rate,
+        value_added=value_added,
+        biodiesel_eq=biodiesel_eq,
+        ethanol_eq=ethanol_eq,
+        fuel_taxable_value=fuel_taxable_value,
+        fuel_tax_rate=fuel_tax_rate,
+    )
+    return _determine_amount('exemption', incentive_number, plant_years, start, params)
 
 def determine_deduction_amount(incentive_number,
                                plant_years,
@@ -165,15 +673,12 @@ def determine_deduction_amount(incentive_number,
     start : int, optional
         Year incentive starts. Defaults to 0.
     """
-    lcs = locals()
-    deduction = np.zeros((plant_years,))
-    if incentive_number == 6: #Referred to as Incentive D1 (for "Deduction 1") in manuscript
-        params = ('NM_value', 'sales_taxable_value', 'sales_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = plant_years
-        deduction = assess_incentive_arr(start, duration, plant_years, deduction, NM_value, sales_taxable_value)
-        deduction *= sales_tax_rate
-    return deduction
+    params = dict(
+        NM_value=NM_value,
+        sales_taxable_value=sales_taxable_value,
+        sales_tax_rate=sales_tax_rate,
+    )
+    return _determine_amount('deduction', incentive_number, plant_years, start, params)
 
 def determine_credit_amount(incentive_number,
                             plant_years,
@@ -218,82 +723,18 @@ def determine_credit_amount(incentive_number,
         Year incentive starts. Defaults to 0.
 
     """
-    lcs = locals()
-    credit = np.zeros((plant_years,))
-    if incentive_number == 7: #Referred to as Incentive C1 (for "Credit 1") in manuscript
-        params = ('TCI', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        # Actually 'qualified capital investment', assume TCI; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 10
-        credit = assess_incentive(start, duration, plant_years, credit, 0.015 * TCI, state_income_tax_assessed)
-    elif incentive_number == 8: #Referred to as Incentive C2 in manuscript
-        params = ('TCI', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        # actually 'qualified investment', assume TCI; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 22
-        credit = assess_incentive(start, duration, plant_years, credit, 0.03 * TCI, state_income_tax_assessed, 7.5e5)
-    elif incentive_number == 9: #Referred to as Incentive C3 in manuscript
-        params = ('ethanol', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        # Fuel content of ethanol is 76100 btu/gal; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 5
-        credit = assess_incentive_arr(start, duration, plant_years, credit, 76100 * 0.2 / 76000 * ethanol, state_income_tax_assessed, 3e6)
-    elif incentive_number == 10: #Referred to as Incentive C4 in manuscript
-        params = ('TCI', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        total_credit = 0.05 * TCI # actually just 'a percentage of qualifying investment', assume 5% of TCI, no max specified but may be inaccurate; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 5
-        credit = assess_incentive(start, duration, plant_years, credit, (0.05 * TCI)/duration, state_income_tax_assessed)
-    elif incentive_number == 11: #Referred to as Incentive C5 in manuscript
-        params = ('state_income_tax_assessed',)
-        check_any_missing_parameter(lcs, params)
-        duration = 15
-        credit = assess_incentive_arr(start, duration, plant_years, credit, state_income_tax_assessed, state_income_tax_assessed)# Credit amount is the entire amount of state income tax assessed
-    elif incentive_number == 12: #Referred to as Incentive C6 in manuscript
-        params = ('ethanol', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        duration = plant_years
-        credit = assess_incentive_arr(start, duration, plant_years, credit, ethanol, state_income_tax_assessed,5e6)
-    elif incentive_number == 13: #Referred to as Incentive C7 in manuscript
-        params = ('TCI', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        if TCI < 1e5:
-            credit_amount = 0
-        if TCI <= 3e5:
-            credit_amount = 0.07 * TCI
-        elif TCI <= 1e6:
-            credit_amount = 0.14 * TCI
-        else:
-            credit_amount = 0.18 * TCI
-        # There are other provisions to the incentive but they are more difficult to model so I will assume the maximum value is achieved via these provisions; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 2 # Estimated, incentive description is not clear
-        credit = assess_incentive(start, duration, plant_years, credit, credit_amount, state_income_tax_assessed, 1e6)
-    elif incentive_number == 14: #Referred to as Incentive C8 in manuscript
-        params = ('TCI', 'property_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        total_credit = 0.25 * TCI # Actually cost of constructing and equipping facility; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 7
-        credit_amount = total_credit/duration #credit must be taken in equal installments over duration
-        credit = assess_incentive(start, duration, plant_years, credit, credit_amount, property_tax_assessed)
-    elif incentive_number == 15: #Referred to as Incentive C9 in manuscript
-        params = ('elec_eq', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        duration = 15
-        credit_amount = 0.25 * elec_eq[start: start + duration] # DON'T MULTIPLY BY TAX RATE HERE
-        credit = assess_incentive(start, duration, plant_years, credit, credit_amount, state_income_tax_assessed, 6.5e5)
-    elif incentive_number == 16: #Referred to as Incentive C10 in manuscript
-        params = ('state_income_tax_assessed',)
-        check_any_missing_parameter(lcs, params)
-        duration = 20
-        credit_amount = 0.75 * state_income_tax_assessed[start: start + duration]# Credit amount depends on amount of state income tax assessed; DON'T MULTIPLY BY TAX RATE HERE
-        credit = assess_incentive(start, duration, plant_years, credit, credit_amount, state_income_tax_assessed)
-    elif incentive_number == 17: #Referred to as Incentive C11 in manuscript
-        params = ('jobs_50', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        credit_amount = 500 * jobs_50 # Number of jobs paying 50k+/year; DON'T MULTIPLY BY TAX RATE HERE
-        duration = 5
-        credit = assess_incentive(start, duration, plant_years, credit, credit_amount, state_income_tax_assessed, 1.75e5)
-    return credit
+    params = dict(
+        wages=wages,
+        TCI=TCI,
+        ethanol=ethanol,
+        fed_income_tax_assessed=fed_income_tax_assessed,
+        elec_eq=elec_eq,
+        jobs_50=jobs_50,
+        utility_tax_assessed=utility_tax_assessed,
+        state_income_tax_assessed=state_income_tax_assessed,
+        property_tax_assessed=property_tax_assessed,
+    )
+    return _determine_amount('credit', incentive_number, plant_years, start, params)
 
 def determine_refund_amount(incentive_number,
                             plant_years,
@@ -329,27 +770,15 @@ def determine_refund_amount(incentive_number,
         Year incentive starts. Defaults to 0.
 
     """
-    lcs = locals()
-    refund = np.zeros((plant_years,))
-    if incentive_number == 18: #Referred to as Incentive R1 (for "Refund 1") in manuscript
-        params = ('IA_value', 'sales_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = 1
-        refund_amount = sales_tax_rate * IA_value # Fees paid to (sub)contractors + cost of racks, shelving, conveyors
-        refund = assess_incentive_arr(start, duration, plant_years, refund, refund_amount, sales_tax_assessed)
-    elif incentive_number == 19: #Referred to as Incentive R2 in manuscript
-        params = ('building_mats', 'sales_tax_rate')
-        check_any_missing_parameter(lcs, params)
-        duration = 1
-        refund_amount = sales_tax_rate  * building_mats # Cost of building and construction materials
-        refund = assess_incentive_arr(start, duration, plant_years, refund, refund_amount, sales_tax_assessed)
-    elif incentive_number == 20: #Referred to as Incentive R3 in manuscript
-        params = ('ethanol', 'state_income_tax_assessed')
-        check_any_missing_parameter(lcs, params)
-        duration = plant_years
-        refund = assess_incentive_arr(start, duration, plant_years, refund, 0.2 * ethanol, state_income_tax_assessed,6e6)
-        #DON'T MULTIPLY BY TAX RATE HERE
-    return refund
+    params = dict(
+        IA_value=IA_value,
+        building_mats=building_mats,
+        ethanol=ethanol,
+        sales_tax_rate=sales_tax_rate,
+        sales_tax_assessed=sales_tax_assessed,
+        state_income_tax_assessed=state_income_tax_assessed,
+    )
+    return _determine_amount('refund', incentive_number, plant_years, start, params)
 
 def determine_tax_incentives(incentive_numbers,
                              **kwargs):
@@ -429,38 +858,130 @@ def determine_tax_incentives(incentive_numbers,
     refunds : 1d array
 
     """
-    incentive_numbers = frozenset(incentive_numbers)
-    exemptions = []
-    deductions = []
-    credits = []
-    refunds = []
-    for i in incentive_numbers:
-        if i in EXEMPTIONS: exemptions.append(i)
-        elif i in DEDUCTIONS: deductions.append(i)
-        elif i in CREDITS: credits.append(i)
-        elif i in REFUNDS: refunds.append(i)
-        else: raise ValueError(f"invalid incentive number '{i}'")
-    get_kwargs = lambda params: {i: kwargs[i] for i in params if i in kwargs}
-    exemption_kwargs = get_kwargs(EXEMPTION_PARAMETERS)
-    deduction_kwargs = get_kwargs(DEDUCTION_PARAMETERS)
-    credit_kwargs = get_kwargs(CREDIT_PARAMETERS)
-    refund_kwargs = get_kwargs(REFUND_PARAMETERS)
-    get_incentives = lambda f, nums, kwargs: sum([f(i, **kwargs) for i in nums]) if nums else f(-1, **kwargs)
-    exemptions = get_incentives(determine_exemption_amount,
-                                exemptions,
-                                exemption_kwargs)
-    deductions = get_incentives(determine_deduction_amount,
-                                deductions,
-                                deduction_kwargs)
-    credits = get_incentives(determine_credit_amount,
-                             credits,
-                             credit_kwargs)
-    refunds = get_incentives(determine_refund_amount,
-                             refunds, refund_kwargs)
-    return exemptions, deductions, credits, refunds
-
-get_incentive_parameters = lambda f: tuple(signature(f).parameters)[1:]
-EXEMPTION_PARAMETERS = get_incentive_parameters(determine_exemption_amount)
-DEDUCTION_PARAMETERS = get_incentive_parameters(determine_deduction_amount)
-CREDIT_PARAMETERS = get_incentive_parameters(determine_credit_amount)
-REFUND_PARAMETERS = get_incentive_parameters(determine_refund_amount)
+    return get_incentive_plan(incentive_numbers)(**kwargs)
+
+#: Parameters given per year (all others are given as a single value).
+YEARLY_PARAMETERS = frozenset([
+    'property_taxable_value', 'biodiesel_eq', 'ethanol_eq', 'fuel_taxable_value',
+    'NM_value', 'sales_taxable_value', 'sales_tax_assessed', 'wages', 'ethanol',
+    'fed_income_tax_assessed', 'elec_eq', 'utility_tax_assessed',
+    'state_income_tax_assessed', 'property_tax_assessed', 'IA_value',
+    'building_mats',
+])
+
+def _batch_parameters(plant_years, kwargs, samples=None):
+    for name, value in kwargs.items():
+        if value is None: continue
+        value = np.asarray(value, dtype=float)
+        ndim = value.ndim
+        if name in YEARLY_PARAMETERS:
+            if ndim == 2: N = value.shape[0]
+            elif ndim > 2: raise ValueError(f"'{name}' must be a 1d or 2d array")
+            else: continue
+        elif ndim == 1:
+            N = value.size
+        elif ndim:
+            raise ValueError(f"'{name}' must be a float or a 1d array")
+        else:
+            continue
+        if samples is None: samples = N
+        elif samples != N: raise ValueError(
+            f"'{name}' has {N} samples; expected {samples}"
+        )
+    if samples is None: samples = 1
+    shape = (samples, plant_years)
+    params = {}
+    for name, value in kwargs.items():
+        if value is None:
+            params[name] = None
+        elif name in YEARLY_PARAMETERS:
+            params[name] = np.broadcast_to(np.asarray(value, dtype=float), shape)
+        else:
+            params[name] = np.asarray(value, dtype=float).reshape([-1, 1])
+    return samples, params
+
+def determine_tax_incentives_batch(incentive_numbers, plant_years, start=0, **kwargs):
+    """
+    Return a tuple of 2d arrays (samples x plant_years) for tax exemptions,
+    deductions, credits, and refunds of many scenarios at once.
+
+    Parameters
+    ----------
+    incentive_numbers : frozenset[int]
+        Incentive types.
+    plant_years : int
+        Number of years plant will operate.
+    start : int or 1d array[int], optional
+        Year incentive starts (or by sample). Defaults to 0.
+
+    Other parameters
+    ----------------
+    Same as in `determine_tax_incentives`. Parameters given per year may be
+    1d arrays (shared by all samples) or 2d arrays (samples x plant_years).
+    Other parameters may be floats (shared by all samples) or 1d arrays
+    (one value per sample).
+
+    Raises
+    ------
+    ValueError
+        On invalid incentive number or inconsistent number of samples.
+
+    Returns
+    -------
+    exemptions : 2d array
+    deductions : 2d array
+    credits : 2d array
+    refunds : 2d array
+
+    """
+    return get_incentive_plan(incentive_numbers).batch(plant_years, start, **kwargs)
+
+def determine_tax_incentives_across_starts(incentive_numbers, plant_years, starts=None, **kwargs):
+    """
+    Return a tuple of 2d arrays (starts x plant_years) for tax exemptions,
+    deductions, credits, and refunds given every start year of the
+    incentives at once (e.g., to find when the plant should come online
+    relative to incentive windows).
+
+    Parameters
+    ----------
+    incentive_numbers : frozenset[int]
+        Incentive types.
+    plant_years : int
+        Number of years plant will operate.
+    starts : 1d array[int], optional
+        Years incentives start. Defaults to every feasible year (i.e., such
+        that incentives given over a window of years from the start year end
+        by the last year of the plant).
+
+    Other parameters
+    ----------------
+    Same as in `determine_tax_incentives_batch`. Parameters are shared by all
+    start years, unless given by start year.
+
+    Raises
+    ------
+    ValueError
+        On invalid incentive number or inconsistent number of samples.
+
+    Returns
+    -------
+    exemptions : 2d array
+    deductions : 2d array
+    credits : 2d array
+    refunds : 2d array
+
+    Notes
+    -----
+    Rows are equal to the results of `determine_tax_incentives` at each start
+    year, where starts are shifted to the year of maximum assessed tax and
+    clamped so that incentives end by the last year of the plant.
+
+    """
+    plan = get_incentive_plan(incentive_numbers)
+    if starts is None:
+        windows = [plant_years if i.duration is None else i.duration
+                   for i in plan.incentives if i.mode == 'window']
+        starts = np.arange(plant_years - max(windows, default=1) + 1)
+    return plan.batch(plant_years, np.asarray(starts, dtype=int).ravel(), **kwargs)
+
@@ -16,6 +16,7 @@ from biorefineries import SAF as saf
 import numpy as np
 from chaospy import distributions as shape
 import incentives as ti
+import blocs as blc
 import pandas as pd
 import os
 from biosteam.evaluation.evaluation_tools import triang
@@ -35,9 +36,7 @@ CFR_CI = 22.003 # g CO2e/MJ, see SI for overview of calculation
 LCFS_CI = 20.19 # g CO2e/MJ, see SI for overview of calculation
 
 # State-specific data
-folder = os.path.dirname(__file__)
-st_data_file = os.path.join(folder, 'state_scenarios_for_import.xlsx')
-st_data = pd.read_excel(st_data_file, index_col=[0])
+st_data = blc.load_state_table()
 
 # States to evaluate
 states = ['Alabama',
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checkpointed evaluations
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+import blocs as blc
+
+def test_evaluation_resumes_from_checkpoint(tmp_path):
+    tea = blc.create_cornstover_tea()
+    model = blc.IncentivesModel(tea.system, exception_hook='raise')
+    calls = [0]
+    stop = [None]
+
+    @model.parameter(element='TEA', kind='isolated', units='%')
+    def set_state_income_tax(state_income_tax):
+        tea.state_income_tax = state_income_tax
+
+    @model.metric(units='USD/gal')
+    def MFSP():
+        if calls[0] == stop[0]: raise KeyboardInterrupt
+        calls[0] += 1
+        return 2.98668849 * tea.solve_price(tea.ethanol_product)
+
+    samples = np.linspace(0, 0.12, 5).reshape([5, 1])
+    store = blc.CheckpointStore(str(tmp_path / 'MFSP'))
+    model.load_samples(samples)
+    stop[0] = 3
+    with pytest.raises(KeyboardInterrupt):
+        blc.evaluate_with_checkpoints(model, store, checkpoint=2)
+    names = [blc.incentives.checkpoints.get_column_name(i) for i in model.table.columns]
+    assert sorted(store.to_frame(names).index) == [0, 1, 2]
+
+    stop[0] = None
+    model.load_samples(samples)
+    table = blc.evaluate_with_checkpoints(model, store, checkpoint=2)
+    assert calls[0] == 5
+    values = table[MFSP.index].values
+    assert (np.diff(values) > 0).all()
+    assert_allclose(store.to_frame(names).values[:, 1], values)
+
+    model.load_samples(samples[::-1])
+    with pytest.raises(ValueError):
+        blc.evaluate_with_checkpoints(model, store)
+
+def test_unsupported_model_api(monkeypatch):
+    import biosteam as bst
+    from blocs.incentives import model
+    monkeypatch.setattr(bst.Model, '_evaluate_sample', lambda self, sample: None)
+    model.check_model_api.cache_clear()
+    with pytest.raises(RuntimeError, match='_evaluate_sample'):
+        blc.evaluate_with_checkpoints(None, None)
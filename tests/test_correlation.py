@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming rank correlations
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import numpy as np
+from types import SimpleNamespace
+from numpy.testing import assert_allclose
+from chaospy import distributions as shape
+from scipy.stats import spearmanr
+import blocs as blc
+
+def test_spearman_accumulator():
+    distributions = [shape.Uniform(0.8, 1.2), shape.Triangle(0, 0.065, 0.12)]
+    parameters = [
+        SimpleNamespace(name=f'p{i}', index=('TEA', f'p{i}'), distribution=j)
+        for i, j in enumerate(distributions)
+    ]
+    np.random.seed(1688)
+    samples = shape.J(*distributions).sample(5000, rule='L').transpose()
+    x, y = samples.transpose()
+    values = np.column_stack([
+        x + 10 * y, # Continuous
+        np.exp(5 * x) + np.random.normal(0, 20, x.size), # Noisy
+        np.maximum(y, 0.05), # Many ties
+    ])
+    values[np.random.random(x.size) < 0.02, 1] = np.nan
+    metrics = [SimpleNamespace(index=('Biorefinery', f'm{i}')) for i in range(3)]
+    correlation = blc.SpearmanAccumulator(parameters, metrics, bins=128)
+    expected = np.array([
+        [spearmanr(i[~np.isnan(j)], j[~np.isnan(j)])[0] for j in values.transpose()]
+        for i in samples.transpose()
+    ])
+    for i in range(0, 5000, 250):
+        correlation.update(samples[i:i + 250], values[i:i + 250])
+        if i == 0: # Exact while setting bins
+            index = ~np.isnan(values[:250, 1])
+            assert_allclose(correlation.rho()[0, 1], spearmanr(x[:250][index], values[:250, 1][index])[0])
+    assert correlation.size == 5000
+    rho, p = correlation.spearman_r()
+    assert_allclose(rho.values, expected, atol=1e-3)
+    assert rho.index.names == ['Element', 'Parameter']
+    assert (p.values[np.abs(expected) > 0.1] < 1e-6).all()
+
+def test_progress_note():
+    from blocs.incentives.checkpoints import get_progress_note
+    distributions = [shape.Uniform(0, 1), shape.Uniform(0, 1)]
+    parameters = [
+        SimpleNamespace(name=f'p{i}', index=('TEA', f'p{i}'), distribution=j)
+        for i, j in enumerate(distributions)
+    ]
+    metrics = [SimpleNamespace(name='m', index=('Biorefinery', 'm'))]
+    correlation = blc.SpearmanAccumulator(parameters, metrics)
+    timer = SimpleNamespace(elapsed_time=3.)
+    assert get_progress_note(0, timer, correlation) == "[0] Elapsed time: 3 sec"
+    np.random.seed(1688)
+    samples = shape.J(*distributions).sample(100, rule='L').transpose()
+    correlation.update(samples, -samples[:, 1:])
+    assert get_progress_note(100, timer, correlation) == "[100] Elapsed time: 3 sec; strongest correlation: -1.00 (p1 - m)"
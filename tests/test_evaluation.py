@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Evaluation of incentivized biorefineries
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+import blocs as blc
+from blocs.incentives import evaluation as ev
+
+def test_solve_incentives_MFSP():
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    tea.sales_tax = 0.05785
+    tea.state_income_tax = 0.065
+    tea.property_tax = 0.0136
+    tea.fuel_tax = 0.
+    incentive_numbers = range(1, 21)
+    MFSPs, totals = ev.solve_incentives_MFSP(tea, incentive_numbers)
+    assert totals.shape == (20, 4)
+    for incentive_number, MFSP, values in zip(incentive_numbers, MFSPs, totals):
+        tea.incentive_numbers = (incentive_number,)
+        assert_allclose(MFSP, 2.98668849 * tea.solve_price(tea.ethanol_product), rtol=1e-6)
+        expected = [tea.exemptions.sum(), tea.deductions.sum(), tea.credits.sum(), tea.refunds.sum()]
+        assert_allclose(values, expected, rtol=1e-6, atol=1e-3)
+
+def test_get_sweep_coordinate():
+    tea = blc.create_cornstover_tea()
+    model = blc.IncentivesModel(tea.system)
+    
+    @model.parameter(element='TEA', kind='isolated', units='%',
+                     distribution=ev.shape.Triangle(0, 0.065, 0.12))
+    def set_state_income_tax(State_income_tax_rate):
+        tea.state_income_tax = State_income_tax_rate
+
+    f_coordinate, bounds = ev.get_sweep_coordinate(model, 'State income tax rate')
+    assert not model.parameters
+    assert_allclose(bounds, (0, 0.12))
+    f_coordinate(0.05)
+    assert tea.state_income_tax == 0.05
+    f_coordinate, bounds = ev.get_sweep_coordinate(model, 'LCCF', 'F_investment')
+    assert bounds is None
+    f_coordinate(1.1)
+    assert tea.F_investment == 1.1
+    with pytest.raises(ValueError):
+        ev.get_sweep_coordinate(model, 'LCCF')
+
+def test_optimize_state_incentives():
+    from itertools import combinations
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+
+    def check(states, candidates=None, max_incentives=None):
+        portfolios = ev.optimize_state_incentives(tea, 'cornstover', states, candidates, max_incentives)
+        assert list(portfolios.index) == states
+        for state in states:
+            numbers, MFSP, MFSP_without_incentives, solved = portfolios.loc[state]
+            available = sorted(ev.get_state_incentive_numbers(state, 'cornstover') if candidates is None else candidates)
+            size = len(available) if max_incentives is None else max_incentives
+            subsets = [j for i in range(size + 1) for j in combinations(available, i)]
+            scenario = ev.get_state_scenario(state, 'cornstover')
+            prices = tea.solve_price_across_scenarios(
+                tea.ethanol_product, [{**scenario, 'incentive_numbers': i} for i in subsets]
+            )[0]
+            MFSPs = dict(zip(subsets, 2.98668849 * prices))
+            assert_allclose(MFSP, MFSPs[numbers])
+            assert_allclose(MFSP_without_incentives, MFSPs[()])
+            best = min(MFSPs.values())
+            assert MFSP <= best + 1e-4
+            assert len(numbers) == min([len(i) for i, j in MFSPs.items() if j <= best + 1e-4])
+        return solved, len(subsets)
+
+    check(['Iowa', 'Kentucky', 'Alabama', 'Illinois'])
+    solved, subsets = check(['Kentucky'], (7, 11, 12, 13, 16, 17, 19), 3)
+    assert solved < subsets # Pruned
+
+def test_evaluate_in_parallel():
+    model = ev.create_IPs_model('cornstover')
+    np.random.seed(1688)
+    samples = model.sample(3, 'L')
+    columns = [i.index for i in model.metrics]
+    table = ev.evaluate_in_parallel(model, ev.create_IPs_model, 'cornstover', samples, processes=2, chunksize=1)
+    values = table[columns].values.copy()
+    assert not np.isnan(values).all(axis=0).any()
+    # Chunks do not depend on the number of processes
+    table = ev.evaluate_in_parallel(model, ev.create_IPs_model, 'cornstover', samples, processes=1, chunksize=1)
+    assert_allclose(table[columns].values, values, rtol=1e-6, atol=1e-6)
+    model.load_samples(samples)
+    table = blc.evaluate_with_checkpoints(model, None)
+    assert_allclose(table[columns].values, values, rtol=1e-2, atol=1e-2) # Within recycle convergence tolerance
+
+def test_states_model_metric_order(monkeypatch):
+    solve_states_MFSP = ev.solve_states_MFSP
+    calls = []
+    def counted(*args, **kwargs):
+        calls.append(None)
+        return solve_states_MFSP(*args, **kwargs)
+    monkeypatch.setattr(ev, 'solve_states_MFSP', counted)
+    model = ev.create_states_model('cornstover')
+    model.metrics = model.metrics[:0:-2] # Subset in reverse order (without the first state)
+    model.load_samples(np.array([model.get_baseline_sample()] * 2))
+    table = blc.evaluate_with_checkpoints(model, None)
+    assert len(calls) == 2 # Solved once per sample, even if samples repeat
+    values = table[[i.index for i in model.metrics]].values
+    assert not np.isnan(values).any()
+    assert_allclose(values[0], values[1])
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import time
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import os
+import sys
+import subprocess
+import blocs
+
+def test_import_does_not_load_biorefineries():
+    code = (
+        "import sys, numpy as np; "
+        "import blocs; "
+        "blocs.determine_tax_incentives((7,), plant_years=33, TCI=1e8, start=3, "
+        "state_income_tax_assessed=np.full(33, 1e6)); "
+        "print('biosteam' in sys.modules)"
+    )
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(blocs.__file__)))
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join([folder, os.environ.get('PYTHONPATH', '')])}
+    output = subprocess.run(
+        [sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert output == ['False']
+
+def test_lazy_names():
+    for module, names in blocs.incentives._lazy_modules.items():
+        module = getattr(blocs.incentives, module)
+        assert set(names) == set(getattr(module, '__all__', ()))
+        for name in names: assert getattr(blocs, name) is getattr(module, name)
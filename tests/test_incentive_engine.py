@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized tax incentive calculations
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import numpy as np
+from numpy.testing import assert_allclose
+from blocs.incentives import tax_incentives as ti
+
+plant_years = 33
+start = 3
+
+def create_parameters(seed=0):
+    rng = np.random.default_rng(seed)
+    P = plant_years
+    return dict(
+        plant_years=P,
+        start=start,
+        value_added=rng.uniform(1e8, 3e8),
+        property_taxable_value=np.concatenate([
+            np.cumsum(rng.uniform(1e7, 1e8, start)),
+            np.linspace(2e8, 0, P - start)
+        ]),
+        property_tax_rate=0.0136,
+        biodiesel_eq=rng.uniform(0, 1e7, P),
+        ethanol_eq=np.cumsum(rng.uniform(0, 1e7, P)),
+        fuel_taxable_value=rng.uniform(0, 1e8, P),
+        fuel_tax_rate=0.05,
+        NM_value=rng.uniform(0, 1e8, P),
+        sales_taxable_value=rng.uniform(0, 1e8, P),
+        sales_tax_rate=0.05785,
+        sales_tax_assessed=rng.uniform(0, 5e6, P),
+        wages=rng.uniform(0, 5e6, P),
+        TCI=rng.uniform(1e5, 4e8),
+        ethanol=rng.uniform(0, 6e7, P),
+        fed_income_tax_assessed=rng.uniform(0, 1e7, P),
+        elec_eq=np.cumsum(rng.uniform(0, 1e7, P)),
+        jobs_50=50,
+        utility_tax_assessed=np.zeros(P),
+        state_income_tax_assessed=rng.uniform(0, 5e6, P) * (rng.uniform(size=P) > 0.2),
+        property_tax_assessed=rng.uniform(0, 5e6, P),
+        IA_value=np.cumsum(rng.uniform(0, 1e6, P)),
+        building_mats=rng.uniform(0, 1e7, P),
+    )
+
+def stack_parameters(samples):
+    params = {}
+    for name, value in samples[0].items():
+        if name in ('plant_years', 'start'):
+            params[name] = value
+        else:
+            params[name] = np.array([i[name] for i in samples])
+    return params
+
+def test_batch_incentives_match_scalar_incentives():
+    samples = [create_parameters(i) for i in range(8)]
+    params = stack_parameters(samples)
+    for numbers in [(i,) for i in range(1, 21)] + [range(1, 21)]:
+        values = ti.determine_tax_incentives_batch(numbers, **params)
+        for j, kwargs in enumerate(samples):
+            for batch, scalar in zip(values, ti.determine_tax_incentives(numbers, **kwargs)):
+                assert_allclose(batch[j], scalar, rtol=1e-12, atol=1e-9)
+
+def test_batch_incentives_broadcast_shared_parameters():
+    kwargs = create_parameters()
+    TCI = np.array([2e5, 5e5, 2e6])
+    exemptions, deductions, credits, refunds = ti.determine_tax_incentives_batch(
+        (7, 13), **{**kwargs, 'TCI': TCI}
+    )
+    assert credits.shape == (3, plant_years)
+    for j, value in enumerate(TCI):
+        expected = ti.determine_tax_incentives((7, 13), **{**kwargs, 'TCI': value})[2]
+        assert_allclose(credits[j], expected)
+
+def test_negative_amounts_are_not_incentives(monkeypatch):
+    kwargs = create_parameters()
+    kwargs['property_taxable_value'] = kwargs['property_taxable_value'] - 1e8 # Negative in later years
+    kwargs['property_tax_assessed'] = kwargs['property_taxable_value'] * kwargs['property_tax_rate']
+    numbers = (1, 2, 5)
+    values = [ti.determine_tax_incentives_batch(numbers, **stack_parameters([kwargs]))[0][0]]
+    for JIT in (False, True):
+        monkeypatch.setattr(ti, 'JIT', JIT)
+        values.append(ti.determine_tax_incentives(numbers, **kwargs)[0])
+    for value in values:
+        assert (value >= 0.).all() and value.any()
+        assert_allclose(value, values[0], rtol=1e-12)
+
+def test_registered_incentive():
+    incentive = ti.Incentive(
+        100, 'credit', 'C100', 3, 'TCI', 'state_income_tax_assessed', factor=0.01,
+    )
+    ti.register_incentive(incentive)
+    try:
+        kwargs = create_parameters()
+        assert 100 in ti.CREDITS
+        credits = ti.determine_tax_incentives((100,), **kwargs)[2]
+        expected = ti.determine_credit_amount(
+            100, plant_years, TCI=kwargs['TCI'], start=start,
+            state_income_tax_assessed=kwargs['state_income_tax_assessed'],
+        )
+        assert_allclose(credits, expected)
+        assert credits.astype(bool).sum() <= 3
+        assert (credits <= kwargs['state_income_tax_assessed']).all()
+    finally:
+        del ti.INCENTIVES[100]
+        ti.CREDITS.discard(100)
+
+def test_incentive_plan_is_cached():
+    plan = ti.get_incentive_plan((6, 7, 18))
+    assert plan is ti.get_incentive_plan(frozenset([18, 7, 6]))
+    assert set(plan.parameters) == {
+        'NM_value', 'sales_taxable_value', 'sales_tax_rate', 'TCI',
+        'state_income_tax_assessed', 'IA_value', 'sales_tax_assessed',
+    }
+    assert not ti.get_incentive_plan(()).parameters
+
+def test_incentive_plan_split():
+    plan = ti.get_incentive_plan(range(1, 21))
+    independent, dependent = plan.split(['state_income_tax_assessed'])
+    assert independent.incentive_numbers.isdisjoint(dependent.incentive_numbers)
+    assert independent.incentive_numbers | dependent.incentive_numbers == plan.incentive_numbers
+    assert 'state_income_tax_assessed' not in independent.parameters
+    kwargs = create_parameters()
+    for total, *values in zip(plan(**kwargs), independent(**kwargs), dependent(**kwargs)):
+        assert_allclose(total, sum(values))
+
+def test_compiled_incentive_plan(monkeypatch):
+    rng = np.random.default_rng(0)
+    plans = [ti.get_incentive_plan(range(1, 21))] + [
+        ti.get_incentive_plan(np.flatnonzero(rng.uniform(size=20) < 0.3) + 1) for i in range(5)
+    ]
+    for seed in range(3):
+        kwargs = create_parameters(seed)
+        kwargs['start'] = seed
+        for plan in plans:
+            monkeypatch.setattr(ti, 'JIT', False)
+            expected = plan(**kwargs)
+            assert_allclose(plan(out=np.zeros([6, plant_years]), **kwargs), expected, rtol=0, atol=0)
+            monkeypatch.setattr(ti, 'JIT', True)
+            assert_allclose(plan(**kwargs), expected, rtol=0, atol=0)
+            assert_allclose(plan(out=np.zeros([4, plant_years]), **kwargs), expected, rtol=0, atol=0)
+    # Same kernel without Numba
+    monkeypatch.setattr(ti, '_get_assess_incentives', lambda: ti.assess_incentives)
+    assert_allclose(plan(**kwargs), expected, rtol=0, atol=0)
+
+def test_incentives_across_starts():
+    kwargs = create_parameters()
+    del kwargs['start']
+    numbers = range(1, 21)
+    values = ti.determine_tax_incentives_across_starts(numbers, **kwargs)
+    for value in values: assert value.shape == (plant_years - 19, plant_years) # C10 is given over 20 years from the start
+    for start in range(plant_years - 19):
+        for across_starts, expected in zip(values, ti.determine_tax_incentives(numbers, start=start, **kwargs)):
+            assert_allclose(across_starts[start], expected, rtol=1e-12, atol=1e-9)
+    starts = [0, 5, 30]
+    TCI = np.array([2e5, 5e5, 2e6]) # Parameters may also be given by start year
+    credits = ti.determine_tax_incentives_across_starts((7, 13, 17), starts=starts, **{**kwargs, 'TCI': TCI})[2]
+    for start, value, credit in zip(starts, TCI, credits):
+        expected = ti.determine_tax_incentives((7, 13, 17), start=start, **{**kwargs, 'TCI': value})[2]
+        assert_allclose(credit, expected)
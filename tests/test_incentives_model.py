@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incentives model
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import inspect
+import pytest
+import numpy as np
+import biosteam as bst
+from numpy.testing import assert_allclose
+import blocs as blc
+from blocs.incentives import model as incentives_model
+
+def test_economic_parameters_skip_simulation():
+    tea = blc.create_cornstover_tea()
+    system = tea.system
+    simulations = [0]
+    def simulate():
+        simulations[0] += 1
+        system.simulate()
+    model = blc.IncentivesModel(system, specification=simulate, exception_hook='raise')
+    BT = tea.BT
+
+    @model.parameter(element='TEA', kind='isolated', units='%')
+    def set_state_income_tax(state_income_tax):
+        tea.state_income_tax = state_income_tax
+
+    @model.parameter(element=BT, kind='coupled', units='%')
+    def set_boiler_efficiency(boiler_efficiency):
+        BT.boiler_efficiency = boiler_efficiency
+
+    @model.metric(units='USD/gal')
+    def MFSP():
+        return 2.98668849 * tea.solve_price(tea.ethanol_product)
+
+    assert model.economic_parameters == (set_state_income_tax,)
+    assert model.process_parameters == (set_boiler_efficiency,)
+    samples = np.array([
+        [0.0, 0.8],
+        [0.065, 0.8],
+        [0.12, 0.8],
+        [0.065, 0.75],
+    ])
+    model.load_samples(samples)
+    model.evaluate()
+    assert simulations[0] == 2
+    values = model.table[MFSP.index].values
+    assert values[0] < values[1] < values[2]
+    tea.state_income_tax = 0.065
+    BT.boiler_efficiency = 0.8
+    system.simulate()
+    assert_allclose(values[1], MFSP(), rtol=1e-4) # Within recycle convergence tolerance
+
+def test_biosteam_model_api(monkeypatch):
+    # Private methods of BioSTEAM models that are overridden
+    incentives_model.check_model_api.cache_clear()
+    incentives_model.check_model_api()
+    for name in ('_update_state', '_reset_system'):
+        assert inspect.signature(getattr(blc.IncentivesModel, name)) == inspect.signature(getattr(bst.Model, name))
+    monkeypatch.setattr(bst.Model, '_reset_system', lambda self, sample: None)
+    incentives_model.check_model_api.cache_clear()
+    with pytest.raises(RuntimeError, match='_reset_system'):
+        blc.IncentivesModel(None)
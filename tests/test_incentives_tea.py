@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incentivized TEAs
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import pytest
+import numpy as np
+import biosteam as bst
+from numpy.testing import assert_allclose
+import blocs as blc
+
+def test_solve_price_across_scenarios():
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    tea.sales_tax = 0.05785
+    tea.state_income_tax = 0.065
+    tea.property_tax = 0.0136
+    tea.fuel_tax = 0.05
+    scenarios = [
+        dict(incentive_numbers=(), F_investment=1.02),
+        dict(incentive_numbers=(7,), state_income_tax=0.04, electricity_price=0.05),
+        dict(incentive_numbers=(1, 10, 18), property_tax=0.02, feedstock_price=0.09),
+        dict(incentive_numbers=(11, 12, 19), sales_tax=0.07, F_investment=0.9),
+        dict(incentive_numbers=(16,), state_tax_by_gross_receipts=True),
+    ]
+    prices, incentives = tea.solve_price_across_scenarios(tea.ethanol_product, scenarios)
+    for price, incentive, scenario in zip(prices, incentives.swapaxes(0, 1), scenarios):
+        original = tea._set_scenario(scenario)
+        try:
+            assert_allclose(price, tea.solve_price(tea.ethanol_product), rtol=1e-6)
+            expected = (tea.exemptions, tea.deductions, tea.credits, tea.refunds)
+            assert_allclose(incentive, expected, rtol=1e-6, atol=1e-3)
+        finally:
+            tea._set_scenario(original)
+
+def test_scenario_overlay():
+    tea = blc.create_cornstover_tea()
+    tea.state_income_tax = 0.065
+    feedstock_price = tea.feedstock.price
+    overlay = tea.compile_scenario(
+        dict(state_income_tax=0.02, incentive_numbers=(7,),
+             electricity_price=0.1, feedstock_price=0.05)
+    )
+    for i in range(2): # Compiled overlays are reusable
+        with overlay:
+            assert tea.state_income_tax == 0.02
+            assert tea.incentive_numbers == (7,)
+            assert tea.electricity_price == 0.1
+            assert tea.feedstock.price == 0.05
+        assert tea.state_income_tax == 0.065
+        assert tea.incentive_numbers == ()
+        assert tea.electricity_price is None
+        assert tea.feedstock.price == feedstock_price
+    with pytest.raises(ZeroDivisionError):
+        with tea.scenario(dict(fuel_tax=0.05)): 1 / 0
+    assert tea.fuel_tax == 0.
+    with overlay:
+        with pytest.raises(RuntimeError):
+            with overlay: pass
+
+def test_electricity_price():
+    from concurrent.futures import ThreadPoolExecutor
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    price = bst.PowerUtility.price
+    utility_cost = tea.utility_cost
+    tea.electricity_price = price
+    assert_allclose(tea.utility_cost, utility_cost)
+    electricity = tea.system.power_utility.rate * tea.operating_hours
+    tea.electricity_price = 0.1
+    assert_allclose(tea.utility_cost, utility_cost + (0.1 - price) * electricity)
+    assert bst.PowerUtility.price == price
+
+    # TEAs sharing a simulation can be evaluated concurrently
+    electricity_prices = [0.03, 0.05, 0.07, 0.09]
+    def solve_price(electricity_price):
+        new = tea.copy()
+        new.electricity_price = electricity_price
+        return new.solve_price(tea.ethanol_product)
+    with ThreadPoolExecutor(4) as executor:
+        prices = list(executor.map(solve_price, electricity_prices))
+    assert bst.PowerUtility.price == price
+    assert (np.diff(prices) < 0).all() # Electricity is a coproduct
+    assert_allclose(prices, [solve_price(i) for i in electricity_prices], rtol=1e-6)
+    scenarios = [dict(electricity_price=i) for i in electricity_prices]
+    assert_allclose(prices, tea.solve_price_across_scenarios(tea.ethanol_product, scenarios)[0], rtol=1e-6)
+
+def test_cash_flow_workspace():
+    from biosteam._tea import NPV_with_sales
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    tea.state_income_tax = 0.065
+    tea.incentive_numbers = (1, 7, 11, 16, 18)
+    tea.solve_price(tea.ethanol_product)
+    workspace = tea._workspace
+    buffers = workspace.buffers
+    args = tea._get_NPV_args()
+    for sales in (0., 1e7, -1e8):
+        assert_allclose(tea._NPV_with_sales(sales, *args), NPV_with_sales(sales, *args))
+        credits = tea.credits
+        tea._NPV_with_sales(sales, *args)
+        assert_allclose(tea.credits, credits)
+        assert tea.credits is not tea.credits # Buffers are not exposed
+        with pytest.raises(ValueError): tea.credits[0] = 1.
+    assert tea._workspace is workspace and workspace.buffers is buffers
+    new = tea.copy()
+    new.solve_price(new.ethanol_product)
+    assert new._workspace is not workspace
+    assert tea._workspace is workspace
+
+def test_solve_price_sweep():
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    tea.sales_tax = 0.05785
+    tea.state_income_tax = 0.065
+    tea.property_tax = 0.0136
+    tea.fuel_tax = 0.
+    tea.incentive_numbers = (1, 10, 18)
+    stream = tea.ethanol_product
+    for name, values in [('state_income_tax', np.linspace(0, 0.12, 13)),
+                         ('property_tax', np.linspace(0, 0.04, 9))]:
+        original = getattr(tea, name)
+        tea.solve_price(stream)
+        sales = tea._sales
+        credits = tea.credits
+        prices, derivatives, breakpoints = tea.solve_price_sweep(stream, name, values[::-1])
+        assert getattr(tea, name) == original
+        assert tea._sales == sales
+        assert_allclose(tea.credits, credits, rtol=0)
+        assert (np.diff(breakpoints) > 0).all()
+        for value, price, derivative in zip(values[::-1], prices, derivatives):
+            setattr(tea, name, value)
+            assert_allclose(price, tea.solve_price(stream), rtol=1e-6)
+            if any([0 <= i - value < 1e-3 for i in breakpoints]): continue
+            setattr(tea, name, value + 1e-3)
+            assert_allclose(derivative, (tea.solve_price(stream) - price) / 1e-3, rtol=1e-2)
+        setattr(tea, name, original)
+
+def test_solve_price_across_IRRs():
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    tea.sales_tax = 0.05785
+    tea.state_income_tax = 0.065
+    tea.property_tax = 0.0136
+    tea.fuel_tax = 0.
+    IRR = tea.IRR
+    IRRs = np.linspace(0.05, 0.2, 4)
+    scenarios = [
+        dict(incentive_numbers=()),
+        dict(incentive_numbers=(1, 10, 18), IRR=0.5), # IRRs take precedence
+        dict(incentive_numbers=(16,), state_tax_by_gross_receipts=True),
+    ]
+    prices, incentives = tea.solve_price_across_scenarios(tea.ethanol_product, scenarios, IRRs)
+    assert prices.shape == (3, 4)
+    assert incentives.shape[:3] == (4, 3, 4)
+    assert_allclose(prices[0], tea.solve_price_across_IRRs(tea.ethanol_product, IRRs))
+    assert tea.IRR == IRR
+    for scenario, scenario_prices, scenario_incentives in zip(scenarios, prices, incentives.swapaxes(0, 1)):
+        for IRR, price, incentive in zip(IRRs, scenario_prices, scenario_incentives.swapaxes(0, 1)):
+            with tea.scenario({**scenario, 'IRR': IRR}):
+                assert_allclose(price, tea.solve_price(tea.ethanol_product), rtol=1e-6)
+                expected = (tea.exemptions, tea.deductions, tea.credits, tea.refunds)
+                assert_allclose(incentive, expected, rtol=1e-6, atol=1e-3)
+    assert (np.diff(prices, axis=1) > 0).all()
+
+def test_solve_sales_convergence():
+    tea = blc.create_cornstover_tea()
+    tea.system.simulate()
+    tea._sales = 0.
+    # Steep segment near the guess and a shallow one beyond it; the first
+    # Newton step is small but far from the root
+    NPV = lambda x, *args: 5000. + (1000. * x if x >= -1. else x - 999.)
+    tea._NPV_with_sales = NPV
+    assert_allclose(tea.solve_sales(), -4001.)
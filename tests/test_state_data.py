@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+State scenario data
+Authors: Dalton Stewart, Yoel Cortes-Pena
+"""
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_allclose
+from blocs.incentives import state_data
+
+def test_state_table_matches_excel(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_data, 'cache_folder', str(tmp_path))
+    monkeypatch.setattr(state_data, '_state_tables', {})
+    file = state_data.state_data_file
+    data = pd.read_excel(file, index_col=[0])
+    table = state_data.load_state_table(file)
+    assert table is state_data.load_state_table(file)
+    assert len(os.listdir(tmp_path)) == 1
+    state_data._state_tables.clear()
+    cached_table = state_data.load_state_table(file)
+    assert cached_table is not table
+    for i in (table, cached_table):
+        assert list(i.states) == list(data.index)
+        assert list(i.columns) == list(data.columns)
+        assert_allclose(i.values, data.to_numpy(dtype=float), equal_nan=True)
+    scenario = cached_table.scenario('Iowa', 'cornstover')
+    assert scenario['state_income_tax'] == data.loc['Iowa', 'Income Tax Rate (decimal)']
+    assert scenario['feedstock_price'] == data.loc['Iowa', 'CS Price (USD/kg)']
+    with pytest.raises(ValueError):
+        cached_table.get('Atlantis', 'CS Price (USD/kg)')
+    monkeypatch.setattr(state_data, 'cache_folder', None)
+    state_data._state_tables.clear()
+    assert state_data.load_state_table(file) is state_data.load_state_table(file)
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_state_incentives():
+    incentives = state_data.load_state_incentives()
+    assert incentives.get('Iowa') == (1, 10, 18)
+    assert incentives.get('Kentucky', 'cornstover') == (11, 12, 19)
+    assert incentives.get('Kentucky', 'sugarcane') == (11, 19)
+    assert incentives.get('Montana', 'corn') == (3, 20)
+    assert incentives.get('Montana', 'cornstover') == (3,)
+    assert incentives.get('Wisconsin', 'corn') == ()
+    overridden = state_data.load_state_incentives(overrides={('Iowa', 'corn'): (10,)})
+    assert overridden.get('Iowa', 'corn') == (10,)
+    assert overridden.get('Iowa', 'cornstover') == (1, 10, 18)
+    assert overridden.get_many(['Utah', 'Texas'], 'corn') == [(16,), ()]
+
+def test_parse_incentive_numbers():
+    assert state_data.parse_incentive_numbers('1,12,21') == (1, 12, 21)
+    assert state_data.parse_incentive_numbers('13, 14') == (13, 14)
+    assert state_data.parse_incentive_numbers(7) == (7,)
+    assert state_data.parse_incentive_numbers(float('nan')) == ()
+    assert state_data.parse_incentive_numbers('') == ()